@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -14,16 +15,18 @@ router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(verify
 
 
 @router.post("/ingest")
-def run_ingest():
+async def run_ingest():
     try:
-        result = ingest_txt_corpus()
+        # Ingestion blocks for the whole corpus pass; run it off the event
+        # loop so admin calls don't pin a worker for the duration.
+        result = await asyncio.to_thread(ingest_txt_corpus)
     except Exception as exc:  # pragma: no cover - surfaced to client
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return result
 
 
 @router.post("/fetch_and_ingest")
-def fetch_and_ingest(pack: Optional[str] = Query(default="all")):
+async def fetch_and_ingest(pack: Optional[str] = Query(default="all")):
     pack_filter = None if not pack or pack.strip().lower() == "all" else pack.strip()
     try:
         specs, packs_loaded = load_seed_packs(pack_filter)
@@ -33,9 +36,9 @@ def fetch_and_ingest(pack: Optional[str] = Query(default="all")):
     if not specs:
         raise HTTPException(status_code=400, detail="No URLs found in the requested seed pack(s).")
 
-    written, failed = fetch_sources(specs)
+    written, failed = await asyncio.to_thread(fetch_sources, specs)
     try:
-        ingest_result = ingest_txt_corpus()
+        ingest_result = await asyncio.to_thread(ingest_txt_corpus)
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
@@ -1,16 +1,22 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 
 load_dotenv(override=True)
-_app_env = os.getenv("APP_ENV", "development")
-_is_production = _app_env.strip().lower() == "production"
-_data_base_default = os.getenv("DATA_BASE_PATH") or ("/data" if _is_production else "./data")
+# Snapshot the environment once; every lookup below is a plain dict hit
+# instead of an os.getenv call.
+_ENV = dict(os.environ)
 
 
+def _get(name: str, default: str = "") -> str:
+    return _ENV.get(name, default)
+
+
+@lru_cache(maxsize=1)
 def _resolve_repo_root() -> Path:
     here = Path(__file__).resolve()
     for parent in [here] + list(here.parents):
@@ -19,20 +25,18 @@ def _resolve_repo_root() -> Path:
     return Path.cwd()
 
 
-_repo_root = _resolve_repo_root()
-
 def _get_bool(name: str, default: bool) -> bool:
-    v = os.getenv(name, str(default)).strip().lower()
+    v = _ENV.get(name, str(default)).strip().lower()
     return v in ("1", "true", "yes", "y", "on")
 
 
 def _get_int(name: str, default: int) -> int:
-    v = os.getenv(name)
+    v = _ENV.get(name)
     return int(v) if v and v.strip().isdigit() else default
 
 
 def _get_float(name: str, default: float) -> float:
-    v = os.getenv(name)
+    v = _ENV.get(name)
     try:
         return float(v) if v is not None else default
     except ValueError:
@@ -41,45 +45,86 @@ def _get_float(name: str, default: float) -> float:
 
 @dataclass(frozen=True)
 class Settings:
-    app_env: str = _app_env
-    port: int = _get_int("PORT", 8000)
-    openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
-    embedding_model: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
-    data_base_path: str = _data_base_default
-    vector_index_path: str = os.getenv("VECTOR_INDEX_PATH") or os.path.join(_data_base_default, "indexes/faiss/index.faiss")
-    corpus_raw_path: str = os.getenv("CORPUS_RAW_PATH") or os.path.join(_data_base_default, "corpus/raw")
-    corpus_version: str = os.getenv("CORPUS_VERSION", "dev")
-    top_k: int = _get_int("TOP_K", 5)
-    top_sources: int = _get_int("TOP_SOURCES", 3)
+    app_env: str
+    port: int
+    openai_api_key: str
+    embedding_model: str
+    data_base_path: str
+    vector_index_path: str
+    vectors_path: str
+    corpus_raw_path: str
+    corpus_version: str
+    top_k: int
+    top_sources: int
+    query_cache_size: int
+    query_cache_threshold: float
 
     # Limits
-    q_limit_day: int = _get_int("QUESTION_LIMIT_PER_DAY", 10)
-    q_limit_session: int = _get_int("QUESTION_LIMIT_PER_SESSION", 10)
-    char_limit: int = _get_int("CHARACTER_LIMIT_PER_QUESTION", 500)
+    q_limit_day: int
+    q_limit_session: int
+    char_limit: int
 
     # Logging DB
-    log_db_path: str = os.getenv("LOG_DB_PATH") or os.path.join(_data_base_default, "logs/events.db")
-    seed_urls_dir: str = os.getenv("SEED_URLS_DIR") or str(_repo_root / "data" / "corpus" / "seed_urls")
+    log_db_path: str
+    seed_urls_dir: str
 
     # Governance flags (not used yet in skeleton, but loaded)
-    strict_grounding: bool = _get_bool("STRICT_GROUNDING", True)
-    citations_required: bool = _get_bool("CITATIONS_REQUIRED", True)
-    llm_model: str = os.getenv("LLM_MODEL", "gpt-4o-mini")
-    llm_temperature: float = _get_float("LLM_TEMPERATURE", 0.2)
-    llm_max_output_tokens: int = _get_int("LLM_MAX_OUTPUT_TOKENS", 700)
+    strict_grounding: bool
+    citations_required: bool
+    llm_model: str
+    llm_temperature: float
+    llm_max_output_tokens: int
 
     # Hashing
-    hash_salt: str = os.getenv("HASH_SALT", "local-dev-salt")
+    hash_salt: str
 
     # Admin / rate limiting
-    admin_token: str = os.getenv("ADMIN_TOKEN", "")
-    admin_token_enabled: bool = _get_bool(
-        "ADMIN_TOKEN_ENABLED",
-        True if _is_production else bool(os.getenv("ADMIN_TOKEN"))
+    admin_token: str
+    admin_token_enabled: bool
+    ip_rate_limit_enabled: bool
+    ip_rate_limit_window_seconds: int
+    ip_rate_limit_max_requests: int
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    app_env = _get("APP_ENV", "development")
+    is_production = app_env.strip().lower() == "production"
+    data_base = _get("DATA_BASE_PATH") or ("/data" if is_production else "./data")
+    return Settings(
+        app_env=app_env,
+        port=_get_int("PORT", 8000),
+        openai_api_key=_get("OPENAI_API_KEY"),
+        embedding_model=_get("EMBEDDING_MODEL") or "text-embedding-3-large",
+        data_base_path=data_base,
+        vector_index_path=_get("VECTOR_INDEX_PATH") or os.path.join(data_base, "indexes/faiss/index.faiss"),
+        vectors_path=_get("VECTORS_PATH") or os.path.join(data_base, "indexes/faiss/vectors.npy"),
+        corpus_raw_path=_get("CORPUS_RAW_PATH") or os.path.join(data_base, "corpus/raw"),
+        corpus_version=_get("CORPUS_VERSION") or "dev",
+        top_k=_get_int("TOP_K", 5),
+        top_sources=_get_int("TOP_SOURCES", 3),
+        query_cache_size=_get_int("QUERY_CACHE_SIZE", 256),
+        query_cache_threshold=_get_float("QUERY_CACHE_THRESHOLD", 0.97),
+        q_limit_day=_get_int("QUESTION_LIMIT_PER_DAY", 10),
+        q_limit_session=_get_int("QUESTION_LIMIT_PER_SESSION", 10),
+        char_limit=_get_int("CHARACTER_LIMIT_PER_QUESTION", 500),
+        log_db_path=_get("LOG_DB_PATH") or os.path.join(data_base, "logs/events.db"),
+        seed_urls_dir=_get("SEED_URLS_DIR") or str(_resolve_repo_root() / "data" / "corpus" / "seed_urls"),
+        strict_grounding=_get_bool("STRICT_GROUNDING", True),
+        citations_required=_get_bool("CITATIONS_REQUIRED", True),
+        llm_model=_get("LLM_MODEL") or "gpt-4o-mini",
+        llm_temperature=_get_float("LLM_TEMPERATURE", 0.2),
+        llm_max_output_tokens=_get_int("LLM_MAX_OUTPUT_TOKENS", 700),
+        hash_salt=_get("HASH_SALT") or "local-dev-salt",
+        admin_token=_get("ADMIN_TOKEN"),
+        admin_token_enabled=_get_bool(
+            "ADMIN_TOKEN_ENABLED",
+            True if is_production else bool(_get("ADMIN_TOKEN")),
+        ),
+        ip_rate_limit_enabled=_get_bool("IP_RATE_LIMIT_ENABLED", is_production),
+        ip_rate_limit_window_seconds=_get_int("IP_RATE_LIMIT_WINDOW_SECONDS", 60),
+        ip_rate_limit_max_requests=_get_int("IP_RATE_LIMIT_MAX_REQUESTS", 30),
     )
-    ip_rate_limit_enabled: bool = _get_bool("IP_RATE_LIMIT_ENABLED", _is_production)
-    ip_rate_limit_window_seconds: int = _get_int("IP_RATE_LIMIT_WINDOW_SECONDS", 60)
-    ip_rate_limit_max_requests: int = _get_int("IP_RATE_LIMIT_MAX_REQUESTS", 30)
 
 
-settings = Settings()
+settings = get_settings()
@@ -0,0 +1,97 @@
+"""SQLite connection management for the events database.
+
+In WAL mode SQLite supports exactly one writer but any number of
+concurrent readers. Writers therefore share a single process-wide
+connection per database, serialized by a lock so transactions never
+collide into SQLITE_BUSY, while readers get cheap per-thread read-only
+connections that never queue behind writes.
+"""
+from __future__ import annotations
+
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=memory",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+_write_conns: dict[str, sqlite3.Connection] = {}
+_write_locks: dict[str, threading.Lock] = {}
+_state_lock = threading.Lock()
+_TLS = threading.local()
+
+
+def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+    cur = conn.cursor()
+    for pragma in _PRAGMAS:
+        cur.execute(pragma)
+    return conn
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open a standalone WAL-configured connection (caller owns lifecycle)."""
+    # isolation_level=None leaves transaction control to explicit
+    # BEGIN/COMMIT, so reads stay autocommit.
+    return _configure(
+        sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    )
+
+
+@contextmanager
+def write_conn(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Yield the single shared writer connection for db_path, serialized.
+
+    The lock is held for the whole block so multi-statement transactions
+    (BEGIN IMMEDIATE ... COMMIT) are atomic with respect to other writers.
+    """
+    with _state_lock:
+        conn = _write_conns.get(db_path)
+        if conn is None:
+            conn = _write_conns[db_path] = connect(db_path)
+            _write_locks[db_path] = threading.Lock()
+        lock = _write_locks[db_path]
+    with lock:
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+
+
+def read_conn(db_path: str) -> sqlite3.Connection:
+    """Return this thread's cached read-only connection for db_path.
+
+    Read-only handles never take the writer lock, so status/admin lookups
+    run concurrently with event writes.
+    """
+    conns = getattr(_TLS, "read_conns", None)
+    if conns is None:
+        conns = _TLS.read_conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        _configure(conn)
+        conns[db_path] = conn
+    return conn
+
+
+@atexit.register
+def close_all() -> None:
+    with _state_lock:
+        for conn in _write_conns.values():
+            try:
+                conn.close()
+            except sqlite3.Error:  # pragma: no cover - best-effort shutdown
+                pass
+        _write_conns.clear()
+        _write_locks.clear()
@@ -1,23 +1,26 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Dict, Iterable, List
 
 
 _CITATION_PATTERN = re.compile(r"\[([A-Za-z]\d+)\]")
 
 
+@lru_cache(maxsize=128)
+def _extract_source_citations_cached(text: str) -> tuple:
+    # findall + dict.fromkeys dedupes in order at C speed, without
+    # per-match object allocation.
+    return tuple(dict.fromkeys(cid.upper() for cid in _CITATION_PATTERN.findall(text)))
+
+
 def extract_source_citations(text: str) -> List[str]:
     if not text:
         return []
-    seen: set[str] = set()
-    ordered: List[str] = []
-    for match in _CITATION_PATTERN.finditer(text):
-        citation_id = match.group(1).upper()
-        if citation_id not in seen:
-            seen.add(citation_id)
-            ordered.append(citation_id)
-    return ordered
+    # enforce_grounding and the response-shaping code both extract from the
+    # same answer string per request; the cache makes the second pass free.
+    return list(_extract_source_citations_cached(text))
 
 
 def filter_citations(citations: Iterable[dict], used_ids: Iterable[str]) -> List[dict]:
@@ -42,9 +45,14 @@ def enforce_grounding(
     citations_required: bool,
     strict: bool,
 ) -> Dict:
-    allowed_set = {cid.upper() for cid in (allowed or []) if cid}
+    # Callers that already hold a normalized frozenset (the retrieval layer
+    # builds one per request) skip the per-call set rebuild.
+    if isinstance(allowed, frozenset):
+        allowed_set = allowed
+    else:
+        allowed_set = frozenset(cid.upper() for cid in (allowed or []) if cid)
     extracted_ordered = extract_source_citations(text)
-    extracted_set = set(extracted_ordered)
+    extracted_set = frozenset(extracted_ordered)
     payload: Dict = {
         "citations": extracted_ordered,
     }
@@ -54,7 +62,9 @@ def enforce_grounding(
         payload["reason"] = "NO_CITATIONS"
         return payload
 
-    invalid = extracted_set - allowed_set
+    # issubset short-circuits without materializing the difference in the
+    # common all-valid case.
+    invalid = frozenset() if extracted_set.issubset(allowed_set) else extracted_set - allowed_set
     if invalid and strict:
         payload["ok"] = False
         payload["reason"] = "INVALID_CITATIONS"
@@ -1,6 +1,27 @@
+import atexit
 import hashlib
-import sqlite3
+import threading
+import time
 from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.db import read_conn, write_conn
+
+
+# Limit counters live in process memory and are checked/incremented under a
+# plain lock, so the request path does dict ops instead of SQLite writes.
+# Counts seed lazily from SQLite on first touch (restarts keep their day
+# totals) and a background flusher persists dirty counts every few seconds,
+# mirroring the write-behind pattern of the event-log queue.
+_FLUSH_INTERVAL_S = 5.0
+_MAX_SESSIONS = 100_000
+
+_lock = threading.Lock()
+_day_counts: Dict[Tuple[str, str], int] = {}  # (usage_date, user_id_hash) -> count
+_session_counts: Dict[str, int] = {}  # session_id -> count
+_dirty_days: Dict[str, Set[Tuple[str, str]]] = {}  # db_path -> dirty day keys
+_dirty_sessions: Dict[str, Set[str]] = {}  # db_path -> dirty session ids
+_flusher_started = False
 
 
 def hash_user_id(user_id: str, salt: str) -> str:
@@ -12,18 +33,110 @@ def _today() -> str:
     return datetime.utcnow().strftime("%Y-%m-%d")
 
 
-def ensure_session(db_path: str, session_id: str, user_id_hash: str) -> None:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT session_id FROM sessions WHERE session_id = ?", (session_id,))
+def _ensure_flusher() -> None:
+    global _flusher_started
+    if _flusher_started:
+        return
+    _flusher_started = True
+    thread = threading.Thread(target=_run_flusher, name="limits-flusher", daemon=True)
+    thread.start()
+
+
+def _run_flusher() -> None:
+    while True:
+        time.sleep(_FLUSH_INTERVAL_S)
+        try:
+            flush_counts()
+        except Exception:  # pragma: no cover - keep the flusher alive
+            pass
+
+
+@atexit.register
+def flush_counts() -> None:
+    """Persist dirty counters and evict stale/overflow cache entries."""
+    today = _today()
+    with _lock:
+        pending = []
+        for db_path, day_keys in _dirty_days.items():
+            session_ids = _dirty_sessions.get(db_path, set())
+            day_rows = [
+                (key[0], key[1], _day_counts[key])
+                for key in day_keys
+                if key in _day_counts
+            ]
+            session_rows = [
+                (_session_counts[sid], sid)
+                for sid in session_ids
+                if sid in _session_counts
+            ]
+            if day_rows or session_rows:
+                pending.append((db_path, day_rows, session_rows))
+        _dirty_days.clear()
+        _dirty_sessions.clear()
+
+        # Old dates never get read again; sessions can re-seed from SQLite.
+        for key in [k for k in _day_counts if k[0] != today]:
+            del _day_counts[key]
+        while len(_session_counts) > _MAX_SESSIONS:
+            _session_counts.pop(next(iter(_session_counts)))
+
+    for db_path, day_rows, session_rows in pending:
+        with write_conn(db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if day_rows:
+                conn.executemany(
+                    """
+                    INSERT INTO daily_usage (usage_date, user_id_hash, question_count)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(usage_date, user_id_hash)
+                    DO UPDATE SET question_count = excluded.question_count
+                    """,
+                    day_rows,
+                )
+            if session_rows:
+                conn.executemany(
+                    "UPDATE sessions SET question_count = ? WHERE session_id = ?",
+                    session_rows,
+                )
+            conn.execute("COMMIT")
+
+
+def _seed_day_count(db_path: str, day_key: Tuple[str, str]) -> int:
+    cur = read_conn(db_path).execute(
+        "SELECT question_count FROM daily_usage WHERE usage_date = ? AND user_id_hash = ?",
+        day_key,
+    )
     row = cur.fetchone()
-    if row is None:
-        cur.execute(
-            "INSERT INTO sessions (session_id, user_id_hash, created_at, question_count) VALUES (?, ?, ?, 0)",
-            (session_id, user_id_hash, datetime.utcnow().isoformat()),
-        )
-    conn.commit()
-    conn.close()
+    return row[0] if row else 0
+
+
+def _seed_session_count(db_path: str, session_id: str) -> Optional[int]:
+    cur = read_conn(db_path).execute(
+        "SELECT question_count FROM sessions WHERE session_id = ?",
+        (session_id,),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def ensure_session(db_path: str, session_id: str, user_id_hash: str) -> None:
+    with _lock:
+        if session_id in _session_counts:
+            return
+    count = _seed_session_count(db_path, session_id)
+    if count is None:
+        count = 0
+        # New sessions still get a durable row immediately; this is the
+        # only per-session write left on the request path.
+        with write_conn(db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, user_id_hash, created_at, question_count) VALUES (?, ?, ?, 0)",
+                (session_id, user_id_hash, datetime.utcnow().isoformat()),
+            )
+            conn.execute("COMMIT")
+    with _lock:
+        _session_counts.setdefault(session_id, count)
 
 
 def check_and_increment(
@@ -34,45 +147,36 @@ def check_and_increment(
     q_limit_session: int,
 ) -> tuple[bool, str]:
     today = _today()
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
+    day_key = (today, user_id_hash)
 
-    # Daily usage
-    cur.execute(
-        "SELECT question_count FROM daily_usage WHERE usage_date = ? AND user_id_hash = ?",
-        (today, user_id_hash),
-    )
-    row = cur.fetchone()
-    daily_count = row[0] if row else 0
-    if daily_count >= q_limit_day:
-        conn.close()
-        return False, "QUESTION_LIMIT_PER_DAY"
+    with _lock:
+        day_count = _day_counts.get(day_key)
+        session_count = _session_counts.get(session_id, -1)
 
-    # Session usage
-    cur.execute("SELECT question_count FROM sessions WHERE session_id = ?", (session_id,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        return False, "SESSION_NOT_INITIALIZED"
-    session_count = row[0]
-    if session_count >= q_limit_session:
-        conn.close()
-        return False, "QUESTION_LIMIT_PER_SESSION"
-
-    cur.execute(
-        """
-        INSERT INTO daily_usage (usage_date, user_id_hash, question_count)
-        VALUES (?, ?, 1)
-        ON CONFLICT(usage_date, user_id_hash)
-        DO UPDATE SET question_count = question_count + 1
-    """,
-        (today, user_id_hash),
-    )
+    # Seed misses outside the lock; the re-check below handles races.
+    seeded_day = _seed_day_count(db_path, day_key) if day_count is None else None
+    seeded_session = _seed_session_count(db_path, session_id) if session_count == -1 else None
 
-    cur.execute(
-        "UPDATE sessions SET question_count = question_count + 1 WHERE session_id = ?",
-        (session_id,),
-    )
-    conn.commit()
-    conn.close()
-    return True, "OK"
+    with _lock:
+        # Re-read the live value unconditionally: another thread may have
+        # incremented between the two critical sections, and acting on the
+        # first read would overwrite its update. setdefault returns the
+        # current count when the key exists and installs the seed when not.
+        day_count = _day_counts.setdefault(day_key, seeded_day if seeded_day is not None else 0)
+        if _session_counts.get(session_id, -1) == -1 and seeded_session is not None:
+            _session_counts.setdefault(session_id, seeded_session)
+        session_count = _session_counts.get(session_id)
+
+        if day_count >= q_limit_day:
+            return False, "QUESTION_LIMIT_PER_DAY"
+        if session_count is None:
+            return False, "SESSION_NOT_INITIALIZED"
+        if session_count >= q_limit_session:
+            return False, "QUESTION_LIMIT_PER_SESSION"
+
+        _day_counts[day_key] = day_count + 1
+        _session_counts[session_id] = session_count + 1
+        _dirty_days.setdefault(db_path, set()).add(day_key)
+        _dirty_sessions.setdefault(db_path, set()).add(session_id)
+        _ensure_flusher()
+        return True, "OK"
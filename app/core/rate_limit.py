@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+import threading
 import time
-from collections import deque
-from typing import Deque, Dict, Tuple
+from typing import Dict, Tuple
 
 from fastapi import HTTPException, Request
 
@@ -11,22 +11,51 @@ from app.core.security import get_client_ip
 from app.observability.logger import log_event
 
 
-_REQUEST_HISTORY: Dict[Tuple[str, str], Deque[float]] = {}
+# (ip, path) -> (tokens, last_refill_monotonic). A token bucket is O(1) per
+# request, unlike the previous per-key deque that was walked on every call.
+_BUCKETS: Dict[Tuple[str, str], Tuple[float, float]] = {}
+_LOCK = threading.Lock()
 
+# Prune cold keys periodically so the bucket map cannot grow unbounded.
+_EVICT_EVERY = 1024
+_calls_since_evict = 0
 
-def enforce_rate_limit(request: Request) -> None:
+
+def _evict_stale(now: float, window: float) -> None:
+    cutoff = now - 2 * window
+    stale = [key for key, (_, last) in _BUCKETS.items() if last < cutoff]
+    for key in stale:
+        del _BUCKETS[key]
+
+
+async def enforce_rate_limit(request: Request) -> None:
+    # Async so FastAPI resolves the dependency on the event loop instead of
+    # bouncing through the threadpool; the body is dict ops plus a queued
+    # log_event, neither of which blocks.
     if not settings.ip_rate_limit_enabled:
         return
     ip = get_client_ip(request)
     path = request.url.path
     key = (ip, path)
-    now = time.time()
-    window = settings.ip_rate_limit_window_seconds
+    window = float(settings.ip_rate_limit_window_seconds)
     max_requests = settings.ip_rate_limit_max_requests
-    dq = _REQUEST_HISTORY.setdefault(key, deque())
-    while dq and now - dq[0] > window:
-        dq.popleft()
-    if len(dq) >= max_requests:
+    now = time.monotonic()
+
+    global _calls_since_evict
+    with _LOCK:
+        tokens, last = _BUCKETS.get(key, (float(max_requests), now))
+        tokens = min(float(max_requests), tokens + (now - last) * max_requests / window)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        _BUCKETS[key] = (tokens, now)
+
+        _calls_since_evict += 1
+        if _calls_since_evict >= _EVICT_EVERY:
+            _calls_since_evict = 0
+            _evict_stale(now, window)
+
+    if not allowed:
         log_event(
             settings.log_db_path,
             "rate_limited",
@@ -36,9 +65,8 @@ def enforce_rate_limit(request: Request) -> None:
             payload={
                 "ip": ip,
                 "path": path,
-                "window_s": window,
+                "window_s": settings.ip_rate_limit_window_seconds,
                 "max": max_requests,
             },
         )
         raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again later.")
-    dq.append(now)
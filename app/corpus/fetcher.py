@@ -1,21 +1,38 @@
 from __future__ import annotations
 
-import json
+import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
-from urllib.parse import urlparse
+from typing import Iterable, List, Optional, Sequence, Tuple
+from functools import lru_cache
+from urllib.parse import ParseResult, urlparse
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from app.core.config import settings
 
 USER_AGENT = "MortgageAgentFetcher/2.1 (+https://github.com/)"
 TIMEOUT = 30
 
+try:  # lxml parses several times faster than the pure-Python html.parser
+    from lxml import html as _lxml_html
+
+    BS_PARSER = "lxml"
+except ImportError:  # pragma: no cover - minimal installs
+    _lxml_html = None
+    BS_PARSER = "html.parser"
+
+# Only the containers and text tags extraction actually visits get built
+# into the tree; head/script/nav markup is dropped during tokenization.
+# `title` stays in for the page-title fallback.
+_CONTENT_STRAINER = SoupStrainer(["main", "article", "title", "h1", "h2", "h3", "p", "li"])
+
 
 @dataclass(frozen=True)
 class SourceSpec:
@@ -24,15 +41,18 @@ class SourceSpec:
     jurisdiction: str
 
 
-STOP_HEADING_TEXT = {
-    "related links",
-    "related information",
-    "you may also like",
-    "resources",
-    "top of page",
-    "report a problem",
-    "share this page",
-}
+STOP_HEADING_TEXT = frozenset(
+    sys.intern(heading)
+    for heading in (
+        "related links",
+        "related information",
+        "you may also like",
+        "resources",
+        "top of page",
+        "report a problem",
+        "share this page",
+    )
+)
 
 STOP_CONTAINS = [
     "date modified",
@@ -53,22 +73,28 @@ STOP_CONTAINS = [
     "social media",
 ]
 
+# One compiled alternation scans each line once in C instead of looping
+# over STOP_CONTAINS with a Python-level `in` per phrase.
+_STOP_CONTAINS_RE = re.compile("|".join(re.escape(stop) for stop in STOP_CONTAINS))
+_WS_RE = re.compile(r"\s+")
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9_-]+")
+
 
 def _normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value or "").strip()
+    return _WS_RE.sub(" ", value or "").strip()
 
 
-def _slug_from_url(url: str) -> str:
-    parsed = urlparse(url)
+def _slug_from_parts(parsed: ParseResult) -> str:
     segments = [seg for seg in parsed.path.split("/") if seg]
     slug = segments[-1] if segments else parsed.netloc.replace(".", "-")
     slug = slug.rsplit(".", 1)[0]
-    slug = re.sub(r"[^a-zA-Z0-9_-]+", "-", slug).strip("-")
+    slug = _SLUG_RE.sub("-", slug).strip("-")
     return slug or "source"
 
 
-def _host_prefix(url: str) -> str:
-    host = urlparse(url).netloc.lower()
+@lru_cache(maxsize=4096)
+def _host_prefix(netloc: str) -> str:
+    host = netloc.lower()
     host = host.split(":", 1)[0]
     if host.startswith(("www2.", "www.", "m.")):
         host = host.split(".", 1)[1]
@@ -79,13 +105,19 @@ def _host_prefix(url: str) -> str:
     return prefix
 
 
-def _source_domain(url: str) -> str:
-    host = urlparse(url).netloc.lower().split(":", 1)[0]
+@lru_cache(maxsize=4096)
+def _source_domain(netloc: str) -> str:
+    host = netloc.lower().split(":", 1)[0]
     if host.startswith(("www2.", "www.", "m.")):
         host = host.split(".", 1)[1]
     return host or "unknown"
 
 
+def _text_length(tag) -> int:
+    # Sum string-node lengths instead of materializing the joined text.
+    return sum(len(s) for s in tag.strings)
+
+
 def _select_content_root(soup: BeautifulSoup):
     candidates = []
     main = soup.find("main")
@@ -95,12 +127,12 @@ def _select_content_root(soup: BeautifulSoup):
     candidates.extend(soup.find_all("article"))
     candidates = [c for c in candidates if c]
     if candidates:
-        return max(candidates, key=lambda tag: len(tag.get_text(" ", strip=True)))
+        return max(candidates, key=_text_length)
     return soup.body or soup
 
 
 def _should_skip_line(text_lower: str) -> bool:
-    if any(stop in text_lower for stop in STOP_CONTAINS):
+    if _STOP_CONTAINS_RE.search(text_lower):
         return True
     stripped = text_lower.strip()
     if len(stripped) <= 6 and stripped.isalpha():
@@ -156,19 +188,17 @@ def _clean_lines(lines: List[str]) -> List[str]:
     return deduped
 
 
-def _extract_lines_and_title(root) -> Tuple[List[str], str]:
+def _collect_lines(tagged_texts: Iterable[Tuple[str, str]]) -> Tuple[List[str], str]:
+    """Shared filtering over (tag_name, text) pairs from either backend."""
     lines: List[str] = []
     first_h1 = ""
-    for tag in root.find_all(["h1", "h2", "h3", "p", "li"], recursive=True):
-        if tag.name in {"script", "style", "noscript"}:
-            continue
-        text = _normalize_whitespace(tag.get_text(" ", strip=True))
+    for name, text in tagged_texts:
         if not text:
             continue
         lower = text.lower()
-        if tag.name == "h1" and not first_h1:
+        if name == "h1" and not first_h1:
             first_h1 = text
-        if tag.name in {"h1", "h2", "h3"}:
+        if name in ("h1", "h2", "h3"):
             if lower in STOP_HEADING_TEXT:
                 break
             if _should_skip_line(lower):
@@ -181,6 +211,44 @@ def _extract_lines_and_title(root) -> Tuple[List[str], str]:
     return _clean_lines(lines), first_h1
 
 
+def _extract_lines_and_title(root) -> Tuple[List[str], str]:
+    tagged = (
+        (tag.name, _normalize_whitespace(tag.get_text(" ", strip=True)))
+        for tag in root.find_all(["h1", "h2", "h3", "p", "li"], recursive=True)
+    )
+    return _collect_lines(tagged)
+
+
+def _select_content_root_lxml(tree):
+    candidates = (
+        tree.findall(".//main")
+        + tree.xpath(".//*[@role='main']")
+        + tree.findall(".//article")
+    )
+    if candidates:
+        return max(candidates, key=lambda el: sum(len(t) for t in el.itertext()))
+    body = tree.find(".//body")
+    return body if body is not None else tree
+
+
+def _extract_lines_and_title_lxml(root) -> Tuple[List[str], str]:
+    # itertext() walks text nodes in C; joining with spaces matches the
+    # bs4 get_text(" ", strip=True) shape before whitespace collapse.
+    tagged = (
+        (node.tag, _normalize_whitespace(" ".join(node.itertext())))
+        for node in root.iter("h1", "h2", "h3", "p", "li")
+    )
+    return _collect_lines(tagged)
+
+
+@lru_cache(maxsize=None)
+def _corpus_dir(path_str: str) -> Path:
+    # One mkdir per process instead of a stat+mkdir pair per fetched URL.
+    path = Path(path_str)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def _write_file(
     spec: SourceSpec,
     url: str,
@@ -190,8 +258,7 @@ def _write_file(
     source_domain: str,
     page_title: str,
 ) -> Path:
-    corpus_path = Path(settings.corpus_raw_path)
-    corpus_path.mkdir(parents=True, exist_ok=True)
+    corpus_path = _corpus_dir(settings.corpus_raw_path)
     retrieved = date.today().isoformat()
     jurisdiction = (spec.jurisdiction or "NA").upper()
     filename = f"{host_prefix}__{slug}__{jurisdiction}__{retrieved}.txt"
@@ -206,8 +273,14 @@ def _write_file(
         f"PAGE_TITLE: {page_title}\n"
         "---\n\n"
     )
-    content = "\n".join(line for line in lines if line)
-    path.write_text(header + content + "\n", encoding="utf-8")
+    # Write header and body separately so the page text is encoded once and
+    # never concatenated into a second full-size string.
+    with open(path, "wb") as handle:
+        handle.write(header.encode("utf-8"))
+        for line in lines:
+            if line:
+                handle.write(line.encode("utf-8"))
+                handle.write(b"\n")
     return path
 
 
@@ -251,43 +324,93 @@ def load_seed_packs(pack: str | None = None) -> Tuple[List[SourceSpec], List[str
     for file_path in files:
         if not file_path.exists():
             raise FileNotFoundError(f"Seed pack not found: {file_path.name}")
-        payload = json.loads(file_path.read_text(encoding="utf-8"))
+        # orjson parses the raw bytes directly, skipping the decode-to-str pass.
+        payload = orjson.loads(file_path.read_bytes())
         loaded_files.append(file_path.name)
         specs.extend(_load_specs_from_payload(payload))
     return specs, loaded_files
 
 
-def fetch_sources(specs: Sequence[SourceSpec]) -> Tuple[List[Path], List[dict]]:
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    written: List[Path] = []
-    failed: List[dict] = []
+FETCH_CONCURRENCY = 16
 
-    for spec in specs:
-        url = spec.url
-        try:
-            response = session.get(url, timeout=TIMEOUT)
-            response.raise_for_status()
-        except requests.RequestException as exc:
-            failed.append({"url": url, "error": str(exc)})
-            continue
 
-        soup = BeautifulSoup(response.text, "html.parser")
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update(
+        {
+            "User-Agent": USER_AGENT,
+            # Negotiate brotli explicitly (requests defaults to gzip/deflate
+            # only); urllib3 decodes br transparently via the brotli package.
+            "Accept-Encoding": "br, gzip, deflate",
+        }
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=FETCH_CONCURRENCY * 2,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared across fetch_sources calls so repeated admin ingests reuse pooled
+# keep-alive connections instead of re-doing TCP/TLS handshakes.
+_SESSION = _build_session()
+
+
+def _fetch_one(session: requests.Session, spec: SourceSpec) -> Tuple[Optional[Path], Optional[dict]]:
+    url = spec.url
+    try:
+        response = session.get(url, timeout=TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        return None, {"url": url, "error": str(exc)}
+
+    html_title = ""
+    if _lxml_html is not None:
+        # Native lxml path: C-level tree walk and text extraction, no
+        # per-tag bs4 object construction.
+        tree = _lxml_html.fromstring(response.content)
+        root = _select_content_root_lxml(tree)
+        lines, first_heading = _extract_lines_and_title_lxml(root)
+        html_title = _normalize_whitespace(tree.findtext(".//title") or "")
+    else:
+        soup = BeautifulSoup(response.content, BS_PARSER, parse_only=_CONTENT_STRAINER)
         root = _select_content_root(soup)
         lines, first_heading = _extract_lines_and_title(root)
-        if not lines:
-            failed.append({"url": url, "error": "No content extracted"})
-            continue
-
-        host_prefix = _host_prefix(url)
-        slug = _slug_from_url(url)
-        domain = _source_domain(url)
-        html_title = ""
         if soup.title and soup.title.string:
             html_title = _normalize_whitespace(soup.title.string)
-        page_title = first_heading or html_title or slug.replace("-", " ").strip().title() or "Untitled Page"
-        out_path = _write_file(spec, url, host_prefix, slug, lines, domain, page_title)
-        written.append(out_path)
+    if not lines:
+        return None, {"url": url, "error": "No content extracted"}
+
+    # Parse the URL once; the host-derived helpers are cached on netloc so
+    # packs that share hosts hit the cache.
+    parsed = urlparse(url)
+    host_prefix = _host_prefix(parsed.netloc)
+    slug = _slug_from_parts(parsed)
+    domain = _source_domain(parsed.netloc)
+    page_title = first_heading or html_title or slug.replace("-", " ").strip().title() or "Untitled Page"
+    out_path = _write_file(spec, url, host_prefix, slug, lines, domain, page_title)
+    return out_path, None
+
+
+def fetch_sources(specs: Sequence[SourceSpec]) -> Tuple[List[Path], List[dict]]:
+    session = _SESSION
+    written: List[Path] = []
+    failed: List[dict] = []
+
+    if not specs:
+        return written, failed
+
+    # Fetches are network-bound, so a small worker pool overlaps the per-URL
+    # RTTs; outputs keep spec order because executor.map preserves it.
+    workers = min(FETCH_CONCURRENCY, len(specs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for out_path, failure in pool.map(lambda spec: _fetch_one(session, spec), specs):
+            if failure is not None:
+                failed.append(failure)
+            elif out_path is not None:
+                written.append(out_path)
 
     return written, failed
 
@@ -303,4 +426,5 @@ def _self_test() -> None:
     assert cleaned == ["Learn more about mortgage insurance."], cleaned
 
 
-_self_test()
+if os.getenv("RUN_STARTUP_SELFTEST"):
+    _self_test()
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from app.core.config import settings
 
 _client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
 
 
 def _get_client() -> OpenAI:
@@ -18,6 +19,29 @@ def _get_client() -> OpenAI:
     return _client
 
 
+def _get_async_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        if not settings.openai_api_key:
+            raise RuntimeError("OPENAI_API_KEY is not configured.")
+        _async_client = AsyncOpenAI(api_key=settings.openai_api_key)
+    return _async_client
+
+
+def warm_up() -> None:
+    """Build the client and open its connection pool at startup.
+
+    Moves the TLS handshake off the first user request; failures are left
+    for the request path to surface.
+    """
+    if not settings.openai_api_key:
+        return
+    try:
+        _get_client().models.list()
+    except Exception:  # pragma: no cover - network/credential issues at boot
+        pass
+
+
 def generate_chat_completion(system_prompt: str, user_prompt: str) -> str:
     client = _get_client()
     response = client.chat.completions.create(
@@ -32,3 +56,40 @@ def generate_chat_completion(system_prompt: str, user_prompt: str) -> str:
     if not response.choices:
         return ""
     return (response.choices[0].message.content or "").strip()
+
+
+async def generate_chat_completion_stream(system_prompt: str, user_prompt: str):
+    """Yield completion text deltas as they arrive from the API."""
+    client = _get_async_client()
+    stream = await client.chat.completions.create(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature,
+        max_tokens=settings.llm_max_output_tokens,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        stream=True,
+    )
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+async def generate_chat_completion_async(system_prompt: str, user_prompt: str) -> str:
+    client = _get_async_client()
+    response = await client.chat.completions.create(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature,
+        max_tokens=settings.llm_max_output_tokens,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+    )
+    if not response.choices:
+        return ""
+    return (response.choices[0].message.content or "").strip()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
 import uuid
 
@@ -7,6 +9,7 @@ from typing import Optional
 
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.api.routes_admin import router as admin_router
@@ -16,9 +19,14 @@ from app.core.grounding import enforce_grounding, extract_source_citations, filt
 from app.core.limits import check_and_increment, ensure_session, hash_user_id
 from app.core.rate_limit import enforce_rate_limit
 from app.core.prompts import SYSTEM_PROMPT, build_context
-from app.llm.client import generate_chat_completion
+from app.llm.client import (
+    generate_chat_completion_async,
+    generate_chat_completion_stream,
+    warm_up,
+)
 from app.observability.logger import init_db, log_event
-from app.rag.retriever import retrieve
+from app.observability.queue import flush_pending
+from app.rag.retriever import index_exists, retrieve, warm_index
 
 
 app = FastAPI(title="Mortgage Agent", version="0.1.0")
@@ -38,6 +46,16 @@ class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
     user_id: Optional[str] = None  # for MVP, any string is fine (email/uuid/etc.)
+    stream: bool = False  # opt-in SSE streaming of completion deltas
+
+
+class ChatBatchRequest(BaseModel):
+    messages: list[ChatRequest]
+
+
+# Keeps one batch request from monopolizing the LLM provider; each item
+# still pays its own question limits.
+BATCH_MAX_QUESTIONS = 10
 
 
 def _ensure_storage_paths() -> None:
@@ -50,6 +68,13 @@ def _ensure_storage_paths() -> None:
 def startup():
     _ensure_storage_paths()
     init_db(settings.log_db_path)
+    warm_up()
+    warm_index()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    flush_pending()
 
 
 @app.get("/health")
@@ -75,7 +100,37 @@ def health():
 
 
 @app.post("/chat")
-def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
+async def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
+    return await _answer_chat(req)
+
+
+@app.post("/chat/batch")
+async def chat_batch(req: ChatBatchRequest, _: None = Depends(enforce_rate_limit)):
+    """Answer several questions in one round-trip.
+
+    Items run concurrently through the same pipeline as /chat; per-item
+    failures (limits, length) come back inline so one rejected question
+    doesn't fail the rest of the batch.
+    """
+    if not req.messages:
+        raise HTTPException(status_code=400, detail="messages must not be empty.")
+    if len(req.messages) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch is limited to {BATCH_MAX_QUESTIONS} questions.",
+        )
+    responses = await asyncio.gather(*(_chat_batch_item(item) for item in req.messages))
+    return {"responses": responses}
+
+
+async def _chat_batch_item(item: ChatRequest) -> dict:
+    try:
+        return await _answer_chat(item.model_copy(update={"stream": False}))
+    except HTTPException as exc:
+        return {"error": exc.detail, "status_code": exc.status_code}
+
+
+async def _answer_chat(req: ChatRequest):
     request_id = f"req_{uuid.uuid4().hex}"
     session_id = req.session_id or f"sess_{uuid.uuid4().hex}"
 
@@ -102,7 +157,8 @@ def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
     raw_user = req.user_id or session_id
     user_id_hash = hash_user_id(raw_user, settings.hash_salt)
 
-    ensure_session(settings.log_db_path, session_id, user_id_hash)
+    # SQLite work runs off the event loop; log_event itself only enqueues.
+    await asyncio.to_thread(ensure_session, settings.log_db_path, session_id, user_id_hash)
 
     # Log request
     log_event(
@@ -115,7 +171,8 @@ def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
     )
 
     # Limits + increment
-    allowed, reason = check_and_increment(
+    allowed, reason = await asyncio.to_thread(
+        check_and_increment,
         settings.log_db_path,
         user_id_hash=user_id_hash,
         session_id=session_id,
@@ -135,7 +192,7 @@ def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
         raise HTTPException(status_code=429, detail=f"Limit reached: {reason}")
 
     try:
-        retrieval_result = retrieve(req.message, top_k=settings.top_k)
+        retrieval_result = await asyncio.to_thread(retrieve, req.message, top_k=settings.top_k)
     except Exception as exc:  # pragma: no cover - log retrieval failures
         log_event(
             settings.log_db_path,
@@ -145,9 +202,9 @@ def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
             user_id_hash,
             {"error": str(exc)},
         )
-        retrieval_result = {"sources": [], "chunks_retrieved": 0, "sources_deduped": 0}
+        retrieval_result = {"sources": [], "sources_payload": [], "chunks_retrieved": 0, "sources_deduped": 0}
 
-    index_missing = not os.path.exists(settings.vector_index_path)
+    index_missing = not index_exists()
     sources_found = retrieval_result.get("sources", []) or []
     chunks_retrieved = retrieval_result.get("chunks_retrieved", len(sources_found))
     sources_deduped = retrieval_result.get("sources_deduped", len(sources_found))
@@ -165,31 +222,15 @@ def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
         },
     )
 
-    citation_payload_full = []
-    for source in sources_found:
-        previews = [
-            (excerpt.get("text") or "")[:200]
-            for excerpt in (source.get("excerpts") or [])
-            if excerpt.get("text")
-        ]
-        citation_payload_full.append(
-            {
-                "id": source.get("source_id"),
-                "title": source.get("page_title") or source.get("title"),
-                "page_title": source.get("page_title"),
-                "source_domain": source.get("source_domain"),
-                "jurisdiction": source.get("jurisdiction"),
-                "url": source.get("source_url"),
-                "score": source.get("score"),
-                "previews": previews,
-            }
-        )
+    # The retriever ships citations pre-shaped (previews are sliced at
+    # ingest), so nothing is rebuilt per request here.
+    citation_payload_full = retrieval_result.get("sources_payload") or []
 
-    allowed_citations = {
-        c.get("source_id")
+    allowed_citations = frozenset(
+        c["source_id"].upper()
         for c in sources_found
         if c.get("source_id")
-    }
+    )
 
     context_block = build_context(sources_found)
     user_prompt = (
@@ -198,28 +239,118 @@ def chat(req: ChatRequest, _: None = Depends(enforce_rate_limit)):
         "Answer using only the provided context excerpts and follow the required sections."
     ) if context_block else ""
 
+    if req.stream:
+        return StreamingResponse(
+            _stream_chat(
+                request_id=request_id,
+                session_id=session_id,
+                user_id_hash=user_id_hash,
+                user_prompt=user_prompt,
+                sources_found=sources_found,
+                citation_payload_full=citation_payload_full,
+                allowed_citations=allowed_citations,
+                index_missing=index_missing,
+            ),
+            media_type="text/event-stream",
+        )
+
     llm_output = ""
     llm_error_reason = None
-    grounding_result = {"ok": False, "reason": "LLM_NOT_EXECUTED", "citations": []}
 
     if user_prompt:
         try:
-            llm_output = generate_chat_completion(SYSTEM_PROMPT, user_prompt)
+            llm_output = await generate_chat_completion_async(SYSTEM_PROMPT, user_prompt)
         except Exception as exc:  # pragma: no cover - external service failure
             llm_error_reason = str(exc)
 
-        if llm_output:
-            grounding_result = enforce_grounding(
-                llm_output,
-                allowed_citations,
-                settings.citations_required,
-                settings.strict_grounding,
-            )
-        else:
-            grounding_result = {"ok": False, "reason": "EMPTY_COMPLETION", "citations": []}
-    else:
+    return _finalize_chat_response(
+        request_id=request_id,
+        session_id=session_id,
+        user_id_hash=user_id_hash,
+        had_context=bool(user_prompt),
+        llm_output=llm_output,
+        llm_error_reason=llm_error_reason,
+        sources_found=sources_found,
+        citation_payload_full=citation_payload_full,
+        allowed_citations=allowed_citations,
+        index_missing=index_missing,
+    )
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def _stream_chat(
+    *,
+    request_id: str,
+    session_id: str,
+    user_id_hash: str,
+    user_prompt: str,
+    sources_found: list,
+    citation_payload_full: list,
+    allowed_citations: frozenset,
+    index_missing: bool,
+):
+    """Stream completion deltas as SSE, then emit the finalized response.
+
+    Deltas go out as they arrive so time-to-first-token is the provider's,
+    not the full completion's. The buffered text still runs through
+    grounding enforcement afterwards; the terminal `done` event carries
+    the same payload the JSON endpoint returns (including any fallback),
+    so clients must treat it as authoritative over rendered deltas.
+    """
+    parts: list[str] = []
+    llm_error_reason = None
+    if user_prompt:
+        try:
+            async for delta in generate_chat_completion_stream(SYSTEM_PROMPT, user_prompt):
+                parts.append(delta)
+                yield _sse("delta", {"text": delta})
+        except Exception as exc:  # pragma: no cover - external service failure
+            llm_error_reason = str(exc)
+
+    response = _finalize_chat_response(
+        request_id=request_id,
+        session_id=session_id,
+        user_id_hash=user_id_hash,
+        had_context=bool(user_prompt),
+        llm_output="".join(parts) if not llm_error_reason else "",
+        llm_error_reason=llm_error_reason,
+        sources_found=sources_found,
+        citation_payload_full=citation_payload_full,
+        allowed_citations=allowed_citations,
+        index_missing=index_missing,
+    )
+    yield _sse("done", response)
+
+
+def _finalize_chat_response(
+    *,
+    request_id: str,
+    session_id: str,
+    user_id_hash: str,
+    had_context: bool,
+    llm_output: str,
+    llm_error_reason: str | None,
+    sources_found: list,
+    citation_payload_full: list,
+    allowed_citations: frozenset,
+    index_missing: bool,
+) -> dict:
+    """Apply grounding policy, pick fallbacks, log, and shape the response."""
+    if not had_context:
         llm_error_reason = llm_error_reason or "NO_CONTEXT_AVAILABLE"
         grounding_result = {"ok": False, "reason": "NO_CONTEXT_AVAILABLE", "citations": []}
+    elif llm_output:
+        grounding_result = enforce_grounding(
+            llm_output,
+            allowed_citations,
+            settings.citations_required,
+            settings.strict_grounding,
+        )
+    else:
+        grounding_result = {"ok": False, "reason": "EMPTY_COMPLETION", "citations": []}
 
     def _fallback_answer() -> str:
         return "I can't answer confidently from my verified sources right now."
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-import json
 import os
 import sqlite3
 from datetime import datetime, timezone
 
+import orjson
+
+from app.core.db import write_conn
+from app.observability.queue import enqueue_event
+
+
+def _json_default(obj):
+    # Sets and frozensets show up in ad-hoc payloads; datetimes and numpy
+    # scalars are handled natively by orjson.
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
 
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -19,7 +31,11 @@ def _ensure_column(cur: sqlite3.Cursor, table: str, column: str, definition: str
 
 def init_db(db_path: str) -> None:
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    with write_conn(db_path) as conn:
+        _create_schema(conn)
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
     cur = conn.cursor()
 
     cur.execute(
@@ -88,13 +104,18 @@ def init_db(db_path: str) -> None:
         chunk_index INTEGER NOT NULL,
         text TEXT NOT NULL,
         embedding_index INTEGER NOT NULL,
+        preview_200 TEXT,
         FOREIGN KEY (doc_id) REFERENCES documents(doc_id)
     )
     """
     )
+    _ensure_column(cur, "chunks", "preview_200", "TEXT")
+    # Retrieval probes chunks by embedding_index and joins on doc_id; both
+    # need B-tree point lookups rather than table scans.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_embedding_index ON chunks(embedding_index)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc_id ON chunks(doc_id)")
 
     conn.commit()
-    conn.close()
 
 
 def log_event(
@@ -105,18 +126,21 @@ def log_event(
     user_id_hash: str | None,
     payload: dict,
 ) -> None:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO events (timestamp, event_type, request_id, session_id, user_id_hash, payload_json) VALUES (?, ?, ?, ?, ?, ?)",
-        (
-            _utc_now(),
-            event_type,
-            request_id,
-            session_id,
-            user_id_hash,
-            json.dumps(payload, ensure_ascii=False),
-        ),
+    row = (
+        _utc_now(),
+        event_type,
+        request_id,
+        session_id,
+        user_id_hash,
+        orjson.dumps(
+            payload, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+        ).decode(),
     )
-    conn.commit()
-    conn.close()
+    if enqueue_event(db_path, row):
+        return
+    # Queue full: fall back to a direct write so events are never dropped.
+    with write_conn(db_path) as conn:
+        conn.execute(
+            "INSERT INTO events (timestamp, event_type, request_id, session_id, user_id_hash, payload_json) VALUES (?, ?, ?, ?, ?, ?)",
+            row,
+        )
@@ -0,0 +1,94 @@
+"""Background batching queue for event log writes.
+
+Request handlers enqueue event rows instead of writing them inline; a
+single daemon thread drains the queue and inserts each batch in one
+transaction, turning one fsync per event into one per batch window.
+"""
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from typing import Iterable, Tuple
+
+from app.core.db import write_conn
+
+
+MAX_QUEUE = 10_000
+BATCH_MAX = 200
+BATCH_WAIT_S = 0.05
+
+_INSERT_SQL = (
+    "INSERT INTO events (timestamp, event_type, request_id, session_id, user_id_hash, payload_json) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+# Items are (db_path, row) tuples matching _INSERT_SQL's placeholders.
+_QUEUE: "queue.Queue[Tuple[str, tuple]]" = queue.Queue(maxsize=MAX_QUEUE)
+_started = False
+_start_lock = threading.Lock()
+
+
+def enqueue_event(db_path: str, row: tuple) -> bool:
+    """Queue one event row; returns False when the queue is full."""
+    _ensure_worker()
+    try:
+        _QUEUE.put_nowait((db_path, row))
+        return True
+    except queue.Full:
+        return False
+
+
+def _ensure_worker() -> None:
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if not _started:
+            thread = threading.Thread(target=_run, name="event-log-writer", daemon=True)
+            thread.start()
+            _started = True
+
+
+def _run() -> None:
+    while True:
+        first = _QUEUE.get()
+        batch = [first]
+        deadline = time.monotonic() + BATCH_WAIT_S
+        while len(batch) < BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _flush(batch)
+
+
+def _flush(items: Iterable[Tuple[str, tuple]]) -> None:
+    by_db: dict[str, list[tuple]] = {}
+    for db_path, row in items:
+        by_db.setdefault(db_path, []).append(row)
+    for db_path, rows in by_db.items():
+        try:
+            with write_conn(db_path) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(_INSERT_SQL, rows)
+                conn.execute("COMMIT")
+        except Exception:  # pragma: no cover - drop rather than kill the writer
+            pass
+
+
+@atexit.register
+def flush_pending() -> None:
+    """Drain whatever is still queued; called at shutdown (best effort)."""
+    items = []
+    while True:
+        try:
+            items.append(_QUEUE.get_nowait())
+        except queue.Empty:
+            break
+    if items:
+        _flush(items)
@@ -1,10 +1,101 @@
 from __future__ import annotations
 
+import re
 
-def chunk_text(text: str, max_chars: int = 1200, overlap: int = 150) -> list[str]:
-    """Split text into overlapping character windows for retrieval."""
-    if max_chars <= 0:
-        raise ValueError("max_chars must be positive")
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - minimal installs
+    tiktoken = None
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_encoder = None
+_encoder_failed = False
+
+
+def _get_encoder():
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed and tiktoken is not None:
+        try:
+            try:
+                _encoder = tiktoken.encoding_for_model(settings.embedding_model)
+            except KeyError:
+                _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # pragma: no cover - BPE download blocked offline
+            # The first encoding_for_model/get_encoding call fetches the
+            # BPE file over the network; without egress that raises. Cache
+            # the failure and chunk by characters, as when tiktoken is
+            # absent.
+            _encoder_failed = True
+    return _encoder
+
+
+def chunk_text(text: str, max_tokens: int = 512, overlap_tokens: int = 64) -> list[str]:
+    """Split text into token-bounded windows aligned to paragraph/sentence breaks.
+
+    Tokens are the unit the embedding API bills and truncates on, and
+    cutting mid-word produces noisier vectors, so paragraphs are packed
+    greedily up to max_tokens with a sentence-level split for oversized
+    paragraphs. Falls back to character windows when tiktoken is missing.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    encoder = _get_encoder()
+    if encoder is None:
+        return _chunk_by_chars(text)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens - 1))
+
+    # Break the text into (piece, token_count) units no larger than the budget.
+    pieces: list[tuple[str, int]] = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        token_count = len(encoder.encode(paragraph))
+        if token_count <= max_tokens:
+            pieces.append((paragraph, token_count))
+            continue
+        for sentence in _SENTENCE_RE.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            tokens = encoder.encode(sentence)
+            if len(tokens) <= max_tokens:
+                pieces.append((sentence, len(tokens)))
+            else:
+                for start in range(0, len(tokens), max_tokens):
+                    window = tokens[start : start + max_tokens]
+                    pieces.append((encoder.decode(window).strip(), len(window)))
+
+    chunks: list[str] = []
+    current: list[tuple[str, int]] = []
+    current_tokens = 0
+    for piece, token_count in pieces:
+        if current and current_tokens + token_count > max_tokens:
+            chunks.append("\n".join(part for part, _ in current))
+            # Seed the next window with trailing pieces for continuity.
+            carried: list[tuple[str, int]] = []
+            carried_tokens = 0
+            for part in reversed(current):
+                if carried_tokens + part[1] > overlap_tokens:
+                    break
+                carried.insert(0, part)
+                carried_tokens += part[1]
+            current = carried
+            current_tokens = carried_tokens
+        current.append((piece, token_count))
+        current_tokens += token_count
+    if current:
+        chunks.append("\n".join(part for part, _ in current))
+
+    return chunks
+
+
+def _chunk_by_chars(text: str, max_chars: int = 1200, overlap: int = 150) -> list[str]:
+    """Original character-window splitter, kept as the no-tiktoken fallback."""
     overlap = max(0, min(overlap, max_chars - 1))
 
     chunks: list[str] = []
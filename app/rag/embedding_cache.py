@@ -0,0 +1,83 @@
+"""Content-addressed cache for OpenAI embeddings.
+
+Vectors are stored in SQLite keyed by (sha256(text), model) as raw
+float32 bytes, so re-ingesting an unchanged corpus or repeating a query
+costs a local lookup instead of an embeddings API round-trip.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.db import write_conn
+
+
+# SQLite's default host-parameter limit is 999; stay under it.
+_SELECT_BATCH = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    text_sha256 BLOB NOT NULL,
+    model TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vec BLOB NOT NULL,
+    PRIMARY KEY (text_sha256, model)
+)
+"""
+
+_schema_ready = False
+
+
+def _key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _ensure_schema(conn) -> None:
+    global _schema_ready
+    if not _schema_ready:
+        conn.execute(_SCHEMA)
+        _schema_ready = True
+
+
+def get_many(texts: Sequence[str], model: str) -> Dict[int, List[float]]:
+    """Return {position: vector} for every input already cached."""
+    keys = [_key(text) for text in texts]
+    by_key: Dict[bytes, bytes] = {}
+    with write_conn(settings.log_db_path) as conn:
+        _ensure_schema(conn)
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), _SELECT_BATCH):
+            batch = unique[start : start + _SELECT_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT text_sha256, vec FROM embedding_cache WHERE model = ? AND text_sha256 IN ({placeholders})",
+                [model, *batch],
+            ).fetchall()
+            for key, blob in rows:
+                by_key[key] = blob
+    hits: Dict[int, List[float]] = {}
+    for position, key in enumerate(keys):
+        blob = by_key.get(key)
+        if blob is not None:
+            hits[position] = np.frombuffer(blob, dtype="float32").tolist()
+    return hits
+
+
+def put_many(texts: Sequence[str], vectors: Sequence[Sequence[float]], model: str) -> None:
+    rows = []
+    for text, vector in zip(texts, vectors):
+        arr = np.asarray(vector, dtype="float32")
+        rows.append((_key(text), model, int(arr.shape[0]), arr.tobytes()))
+    if not rows:
+        return
+    with write_conn(settings.log_db_path) as conn:
+        _ensure_schema(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (text_sha256, model, dim, vec) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("COMMIT")
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+import numpy as np
 from openai import OpenAI
 
 from app.core.config import settings
+from app.rag import embedding_cache
 
 
+# Keep each request well under the API's per-request input cap and fan
+# batches out concurrently; the work is pure network wait.
+EMBED_BATCH_SIZE = 128
+EMBED_CONCURRENCY = 8
+
 _client: OpenAI | None = None
 
 
@@ -19,10 +27,56 @@ def _client_instance() -> OpenAI:
     return _client
 
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+def _embed_batch(batch: List[str], model: str) -> List[List[float]]:
+    # The OpenAI client retries transient failures itself (max_retries).
+    response = _client_instance().embeddings.create(model=model, input=batch)
+    return [item.embedding for item in response.data]
+
+
+def _embed_batched(texts: List[str], model: str) -> List[List[float]]:
+    batches = [texts[i : i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+    if len(batches) == 1:
+        return _embed_batch(batches[0], model)
+
+    results: List[List[float]] = []
+    workers = min(EMBED_CONCURRENCY, len(batches))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch_vectors in pool.map(lambda b: _embed_batch(b, model), batches):
+            results.extend(batch_vectors)
+    return results
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embed `texts` into a C-contiguous float32 (n, d) array.
+
+    FAISS requires row-major float32 and copies anything else, so rows are
+    written straight into one preallocated matrix instead of returning
+    nested lists for callers to convert.
+    """
     if not texts:
-        return []
+        return np.empty((0, 0), dtype=np.float32)
 
-    client = _client_instance()
-    response = client.embeddings.create(model=settings.embedding_model, input=texts)
-    return [item.embedding for item in response.data]
+    model = settings.embedding_model
+    cached = embedding_cache.get_many(texts, model)
+    missing = [i for i in range(len(texts)) if i not in cached]
+
+    fresh: List[List[float]] = []
+    missing_texts: List[str] = []
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fresh = _embed_batched(missing_texts, model)
+
+    if cached:
+        dim = len(next(iter(cached.values())))
+    else:
+        dim = len(fresh[0]) if fresh else 0
+    out = np.empty((len(texts), dim), dtype=np.float32)
+    for position, vector in cached.items():
+        out[position] = vector
+    for position, vector in zip(missing, fresh):
+        out[position] = vector
+
+    if missing:
+        embedding_cache.put_many(missing_texts, fresh, model)
+
+    return out
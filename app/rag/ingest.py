@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import os
-import sqlite3
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Tuple
@@ -11,9 +11,21 @@ import faiss
 import numpy as np
 
 from app.core.config import settings
+from app.core.db import write_conn
 from app.observability.logger import init_db
 from app.rag.chunking import chunk_text
 from app.rag.embeddings import embed_texts
+from app.rag.query_cache import query_cache
+from app.rag.retriever import invalidate_index_cache, set_index_exists
+
+
+# HNSW graph parameters: M controls per-node links, efConstruction the
+# build-time candidate list. Search-time efSearch lives in the retriever.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
+# Concurrent corpus file reads; chunking overlaps I/O wait in the pool.
+READ_CONCURRENCY = 16
 
 
 def _utc_now() -> str:
@@ -21,9 +33,13 @@ def _utc_now() -> str:
 
 
 def _normalize_vectors(vectors: np.ndarray) -> np.ndarray:
-    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    # In-place normalization: einsum computes row norms without the
+    # intermediate squared matrix, and /= avoids allocating a second
+    # full-size result (hundreds of MB for a large corpus).
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
     norms[norms == 0] = 1.0
-    return vectors / norms
+    vectors /= norms[:, None]
+    return vectors
 
 
 def _read_txt_files(path: Path) -> List[Path]:
@@ -32,18 +48,17 @@ def _read_txt_files(path: Path) -> List[Path]:
 
 
 def _split_header_body(raw_text: str) -> Tuple[Dict[str, str], List[str]]:
-    header_lines: List[str] = []
-    body_lines: List[str] = []
-    in_header = True
-
-    for line in raw_text.splitlines():
-        if in_header and line.strip() == "---":
-            in_header = False
-            continue
-        if in_header:
-            header_lines.append(line)
-        else:
-            body_lines.append(line)
+    # One C-level substring scan instead of a Python loop over every line.
+    # Without a separator everything is header, matching the old toggle.
+    if raw_text.startswith("---\n"):
+        header, body = "", raw_text[4:]
+    else:
+        header, sep, body = raw_text.partition("\n---\n")
+        if not sep:
+            header, body = raw_text, ""
+
+    header_lines = header.splitlines()
+    body_lines = body.splitlines()
 
     metadata: Dict[str, str] = {}
     for line in header_lines:
@@ -81,6 +96,17 @@ def _build_doc_metadata(metadata: Dict[str, str], file_path: Path) -> Dict[str,
     }
 
 
+def _process_file(file_path: Path) -> Tuple[Dict[str, str], str, List[str]]:
+    """Read, parse, and chunk one corpus file (runs in the read pool)."""
+    text = file_path.read_text(encoding="utf-8")
+    metadata, body_lines = _split_header_body(text)
+    doc_fields = _build_doc_metadata(metadata, file_path)
+    body_text = "\n".join(body_lines).strip()
+    title = doc_fields.get("page_title") or _derive_title(body_lines, doc_fields["title_fallback"])
+    chunks = chunk_text(body_text) if body_text else []
+    return doc_fields, title, chunks
+
+
 def ingest_txt_corpus() -> dict:
     init_db(settings.log_db_path)  # ensure tables exist
 
@@ -91,32 +117,24 @@ def ingest_txt_corpus() -> dict:
 
     os.makedirs(os.path.dirname(settings.vector_index_path), exist_ok=True)
 
-    conn = sqlite3.connect(settings.log_db_path)
-    cur = conn.cursor()
-
-    # Reset documents/chunks for fresh ingestion
-    cur.execute("DELETE FROM chunks")
-    cur.execute("DELETE FROM documents")
-    conn.commit()
-
+    doc_rows: List[tuple] = []
     chunk_texts: List[str] = []
     chunk_meta: List[dict] = []
     doc_count = 0
 
-    for file_path in files:
-        text = file_path.read_text(encoding="utf-8")
-        metadata, body_lines = _split_header_body(text)
-        doc_fields = _build_doc_metadata(metadata, file_path)
-        body_text = "\n".join(body_lines).strip()
+    # Read and chunk files concurrently; map() preserves file order so the
+    # assembled rows below are deterministic. SQLite writes stay on this
+    # thread.
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(READ_CONCURRENCY, len(files))) as pool:
+            processed = list(pool.map(_process_file, files))
+    else:
+        processed = [_process_file(files[0])]
 
+    for doc_fields, title, chunks in processed:
         doc_id = str(uuid.uuid4())
-        title = doc_fields.get("page_title") or _derive_title(body_lines, doc_fields["title_fallback"])
 
-        cur.execute(
-            """
-            INSERT INTO documents (doc_id, title, page_title, source_name, source_url, source_domain, jurisdiction, published_date, retrieved_date, corpus_version, content_type, is_approved)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        doc_rows.append(
             (
                 doc_id,
                 title,
@@ -130,14 +148,10 @@ def ingest_txt_corpus() -> dict:
                 settings.corpus_version,
                 doc_fields["content_type"],
                 1,
-            ),
+            )
         )
+        doc_count += 1
 
-        if not body_text:
-            doc_count += 1
-            continue
-
-        chunks = chunk_text(body_text)
         for idx, chunk in enumerate(chunks):
             chunk_id = f"{doc_id}_{idx}"
             chunk_texts.append(chunk)
@@ -148,42 +162,79 @@ def ingest_txt_corpus() -> dict:
                     "chunk_index": idx,
                 }
             )
-        doc_count += 1
 
-    conn.commit()
+    # Reset documents/chunks for fresh ingestion in one transaction; one WAL
+    # commit instead of a write per row.
+    with write_conn(settings.log_db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM chunks")
+        conn.execute("DELETE FROM documents")
+        conn.executemany(
+            """
+            INSERT INTO documents (doc_id, title, page_title, source_name, source_url, source_domain, jurisdiction, published_date, retrieved_date, corpus_version, content_type, is_approved)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            doc_rows,
+        )
+        conn.execute("COMMIT")
 
     if not chunk_texts:
-        conn.close()
         if os.path.exists(settings.vector_index_path):
             os.remove(settings.vector_index_path)
+        if os.path.exists(settings.vectors_path):
+            os.remove(settings.vectors_path)
+        invalidate_index_cache()
+        set_index_exists(False)
+        query_cache.clear()
         return {"docs": doc_count, "chunks": 0, "index_path": settings.vector_index_path}
 
-    embeddings = embed_texts(chunk_texts)
-    vectors = np.asarray(embeddings, dtype="float32")
-    vectors = _normalize_vectors(vectors)
+    # embed_texts already returns a fresh contiguous float32 matrix, so
+    # normalization can mutate it directly.
+    vectors = _normalize_vectors(embed_texts(chunk_texts))
     dim = vectors.shape[1]
 
-    index = faiss.IndexFlatIP(dim)
+    # int8 scalar quantization quarters index size and memory traffic per
+    # search; recall loss at this dimensionality is negligible. Training
+    # just fits the per-dimension quantization ranges.
+    index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.train(vectors)
     index.add(vectors)
     faiss.write_index(index, settings.vector_index_path)
 
-    for embedding_index, meta in enumerate(chunk_meta):
-        cur.execute(
+    # Sidecar copy of the normalized vectors, row i == embedding_index i.
+    # Loadable with mmap_mode='r' for filtered numpy reranks (V[ids] @ q)
+    # without reconstructing quantized vectors from the FAISS file.
+    np.save(settings.vectors_path, vectors)
+
+    # Citation previews are sliced once here instead of per request.
+    chunk_rows = [
+        (
+            meta["chunk_id"],
+            meta["doc_id"],
+            meta["chunk_index"],
+            chunk_texts[embedding_index],
+            embedding_index,
+            chunk_texts[embedding_index][:200],
+        )
+        for embedding_index, meta in enumerate(chunk_meta)
+    ]
+    with write_conn(settings.log_db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
             """
-            INSERT INTO chunks (chunk_id, doc_id, chunk_index, text, embedding_index)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO chunks (chunk_id, doc_id, chunk_index, text, embedding_index, preview_200)
+            VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (
-                meta["chunk_id"],
-                meta["doc_id"],
-                meta["chunk_index"],
-                chunk_texts[embedding_index],
-                embedding_index,
-            ),
+            chunk_rows,
         )
+        conn.execute("COMMIT")
 
-    conn.commit()
-    conn.close()
+    # Cached retrieval results and the resident index refer to the old
+    # index file/chunk rows.
+    invalidate_index_cache()
+    set_index_exists(True)
+    query_cache.clear()
 
     return {
         "docs": doc_count,
@@ -0,0 +1,61 @@
+"""Approximate query cache for retrieval results.
+
+Paraphrased questions embed to nearly identical vectors, so retrieval
+results are cached against the query embedding: a lookup is one matrix-
+vector product over the cached embeddings, and any cached query whose
+cosine similarity clears the threshold reuses the stored result instead
+of re-running the FAISS search.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class QueryCache:
+    def __init__(self, capacity: int, threshold: float) -> None:
+        self._capacity = max(1, capacity)
+        self._threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (capacity, dim) float32
+        self._results: List[Dict[str, Any]] = []
+        self._next_slot = 0
+
+    def lookup(self, query_vec: np.ndarray) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            count = len(self._results)
+            if count == 0 or self._vectors is None:
+                return None
+            # Vectors are L2-normalized, so one GEMV gives cosine scores.
+            scores = self._vectors[:count] @ query_vec
+            best = int(np.argmax(scores))
+            if scores[best] >= self._threshold:
+                return self._results[best]
+            return None
+
+    def insert(self, query_vec: np.ndarray, result: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self._capacity, query_vec.shape[0]), dtype="float32")
+            slot = self._next_slot
+            if len(self._results) < self._capacity:
+                self._results.append(result)
+            else:
+                self._results[slot] = result
+            self._vectors[slot] = query_vec
+            self._next_slot = (slot + 1) % self._capacity
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._results = []
+            self._next_slot = 0
+
+
+# Shared instance used by the retrieval path; cleared after re-ingest so
+# stale results never outlive an index rebuild.
+query_cache = QueryCache(settings.query_cache_size, settings.query_cache_threshold)
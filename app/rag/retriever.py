@@ -1,94 +1,304 @@
 from __future__ import annotations
 
+import heapq
 import os
+import queue
 import sqlite3
+import threading
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 import faiss
 import numpy as np
 
 from app.core.config import settings
+from app.core.db import read_conn
 from app.rag.embeddings import embed_texts
+from app.rag.query_cache import query_cache
 
 
 MAX_EXCERPTS_PER_SOURCE = 3
 
+# Accuracy/latency knob for HNSW indexes; higher widens the candidate list.
+HNSW_EF_SEARCH = 64
+
+_index_lock = threading.Lock()
+_index: Optional[faiss.Index] = None
+_index_mtime_ns: int = 0
+_index_exists: Optional[bool] = None
+
+
+def index_exists() -> bool:
+    """Cached 'does the index file exist' check.
+
+    The path only changes on ingest, which updates the flag, so the hot
+    path skips a stat() syscall per request.
+    """
+    global _index_exists
+    if _index_exists is None:
+        _index_exists = os.path.exists(settings.vector_index_path)
+    return _index_exists
+
+
+def set_index_exists(value: bool) -> None:
+    global _index_exists
+    _index_exists = value
+
+
+def _load_index(index_path: str) -> faiss.Index:
+    # Memory-mapping keeps raw vectors in page cache shared across
+    # processes; not every index type supports it, so fall back to a
+    # plain load.
+    try:
+        return faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except Exception:
+        return faiss.read_index(index_path)
+
+
+def _get_index(index_path: str) -> faiss.Index:
+    # mtime guards against the index being rebuilt by another process;
+    # in-process ingest invalidates explicitly.
+    global _index, _index_mtime_ns
+    mtime_ns = os.stat(index_path).st_mtime_ns
+    with _index_lock:
+        if _index is None or mtime_ns != _index_mtime_ns:
+            index = _load_index(index_path)
+            if hasattr(index, "hnsw"):
+                index.hnsw.efSearch = HNSW_EF_SEARCH
+            _index = index
+            _index_mtime_ns = mtime_ns
+        return _index
+
+
+def invalidate_index_cache() -> None:
+    """Drop the resident index so the next query reloads from disk."""
+    global _index, _index_mtime_ns
+    with _index_lock:
+        _index = None
+        _index_mtime_ns = 0
+
+
+def warm_index() -> None:
+    """Load the index at startup so the first query doesn't pay for it."""
+    if index_exists():
+        _get_index(settings.vector_index_path)
+
+
+# --- search micro-batching ---------------------------------------------------
+# Concurrent retrieve() calls (each in its own to_thread worker) funnel
+# through one batcher thread that stacks whatever queries are pending into
+# a single index.search call, sharing graph traversal and base-vector
+# reads. Draining is adaptive: a lone query runs immediately in a batch of
+# one, while queries arriving during an in-flight search form the next
+# batch — no fixed coalescing delay.
+_SEARCH_BATCH_MAX = 32
+
+
+class _SearchRequest:
+    __slots__ = ("vec", "top_k", "index", "event", "scores", "indices", "error")
+
+    def __init__(self, index: faiss.Index, vec: np.ndarray, top_k: int):
+        self.index = index
+        self.vec = vec
+        self.top_k = top_k
+        self.event = threading.Event()
+        self.scores: Optional[np.ndarray] = None
+        self.indices: Optional[np.ndarray] = None
+        self.error: Optional[Exception] = None
+
+
+_search_queue: "queue.SimpleQueue[_SearchRequest]" = queue.SimpleQueue()
+_search_worker_lock = threading.Lock()
+_search_worker_started = False
+
+
+def _ensure_search_worker() -> None:
+    global _search_worker_started
+    if _search_worker_started:
+        return
+    with _search_worker_lock:
+        if _search_worker_started:
+            return
+        thread = threading.Thread(target=_run_search_worker, name="faiss-search-batcher", daemon=True)
+        thread.start()
+        _search_worker_started = True
+
+
+def _execute_search_batch(batch: List[_SearchRequest]) -> None:
+    try:
+        top_k = max(item.top_k for item in batch)
+        stacked = np.vstack([item.vec.reshape(1, -1) for item in batch])
+        scores, indices = batch[0].index.search(stacked, top_k)
+        for row, item in enumerate(batch):
+            item.scores = scores[row, : item.top_k]
+            item.indices = indices[row, : item.top_k]
+    except Exception as exc:  # pragma: no cover - surfaced to the caller
+        for item in batch:
+            item.error = exc
+    finally:
+        for item in batch:
+            item.event.set()
+
+
+def _run_search_worker() -> None:
+    carry: List[_SearchRequest] = []
+    while True:
+        first = carry.pop(0) if carry else _search_queue.get()
+        batch = [first]
+        while len(batch) < _SEARCH_BATCH_MAX:
+            try:
+                item = _search_queue.get_nowait()
+            except queue.Empty:
+                break
+            # A reload (mtime/ingest invalidation) can leave requests
+            # holding different index generations; don't mix them.
+            if item.index is not first.index:
+                carry.append(item)
+                break
+            batch.append(item)
+        _execute_search_batch(batch)
+
+
+def _search_coalesced(index: faiss.Index, query_vec: np.ndarray, top_k: int):
+    """Run index.search through the batcher; returns 1-D score/index rows."""
+    _ensure_search_worker()
+    request = _SearchRequest(index, query_vec, top_k)
+    _search_queue.put(request)
+    request.event.wait()
+    if request.error is not None:
+        raise request.error
+    return request.scores, request.indices
+
 
 def _normalize(vec: np.ndarray) -> np.ndarray:
-    norm = np.linalg.norm(vec)
-    if norm == 0:
+    # BLAS dot for the squared norm and an in-place scale: no temporary
+    # array per query.
+    squared = float(np.dot(vec, vec))
+    if squared == 0.0:
         return vec
-    return vec / norm
-
-
-def _fetch_chunk_metadata(cur: sqlite3.Cursor, embedding_index: int) -> Optional[Dict[str, Any]]:
-    cur.execute(
-        """
-        SELECT c.chunk_id, c.text, c.doc_id, d.title, d.page_title, d.jurisdiction, d.source_url, d.source_name, d.source_domain
-        FROM chunks c
-        JOIN documents d ON c.doc_id = d.doc_id
-        WHERE c.embedding_index = ?
-        """,
-        (embedding_index,),
-    )
-    row = cur.fetchone()
-    if not row:
-        return None
-    return {
-        "chunk_id": row[0],
-        "text": row[1],
-        "doc_id": row[2],
-        "title": row[3],
-        "page_title": row[4],
-        "jurisdiction": row[5] or "",
-        "source_url": row[6],
-        "source_name": row[7],
-        "source_domain": row[8],
-    }
+    vec *= 1.0 / np.sqrt(squared)
+    return vec
+
+
+# Stay under SQLite's default 999-variable limit when binding IN () lists.
+_SELECT_BATCH = 900
+
+
+def _fetch_chunk_metadata_batch(
+    cur: sqlite3.Cursor, embedding_indices: List[int]
+) -> Dict[int, Dict[str, Any]]:
+    """Fetch metadata for all hits in one IN () query per 900 indices."""
+    meta_by_idx: Dict[int, Dict[str, Any]] = {}
+    for start in range(0, len(embedding_indices), _SELECT_BATCH):
+        batch = embedding_indices[start : start + _SELECT_BATCH]
+        placeholders = ",".join("?" * len(batch))
+        cur.execute(
+            f"""
+            SELECT c.embedding_index, c.chunk_id, c.text, c.doc_id, d.title, d.page_title, d.jurisdiction, d.source_url, d.source_name, d.source_domain, c.preview_200
+            FROM chunks c
+            JOIN documents d ON c.doc_id = d.doc_id
+            WHERE c.embedding_index IN ({placeholders})
+            """,
+            batch,
+        )
+        for row in cur.fetchall():
+            meta_by_idx[row[0]] = {
+                "chunk_id": row[1],
+                "text": row[2],
+                "doc_id": row[3],
+                "title": row[4],
+                "page_title": row[5],
+                "jurisdiction": row[6] or "",
+                "source_url": row[7],
+                "source_name": row[8],
+                "source_domain": row[9],
+                # Rows ingested before the preview_200 migration fall back
+                # to slicing.
+                "preview": row[10] if row[10] is not None else (row[2] or "")[:200],
+            }
+    return meta_by_idx
+
+
+@lru_cache(maxsize=1024)
+def _embed_query_cached(text: str) -> tuple:
+    """Exact-match LRU over query embeddings.
+
+    Sits above the persistent embedding cache: a repeat of a recent query
+    skips even the SQLite lookup and returns the vector from memory.
+    """
+    embeddings = embed_texts([text])
+    if embeddings.size == 0:
+        return ()
+    return tuple(embeddings[0].tolist())
 
 
 def _empty_result() -> Dict[str, Any]:
     return {"sources": [], "chunks_retrieved": 0, "sources_deduped": 0}
 
 
-def retrieve(query: str, top_k: Optional[int] = None) -> Dict[str, Any]:
+def retrieve(
+    query: str,
+    top_k: Optional[int] = None,
+    query_vec: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """Search the index for `query`.
+
+    Callers that already hold the query embedding (e.g. from an earlier
+    cache probe) pass it as `query_vec` so the text is embedded at most
+    once per request; otherwise it is computed here and shared by the
+    semantic-cache lookup and the FAISS search below.
+    """
     cleaned = (query or "").strip()
     if not cleaned:
         return _empty_result()
 
     index_path = settings.vector_index_path
-    if not os.path.exists(index_path):
+    if not index_exists():
         return _empty_result()
 
     top_k = top_k or settings.top_k
     if top_k <= 0:
         return _empty_result()
 
-    embeddings = embed_texts([cleaned])
-    if not embeddings:
-        return _empty_result()
-
-    query_vec = np.asarray(embeddings[0], dtype="float32")
+    if query_vec is None:
+        embedding = _embed_query_cached(cleaned)
+        if not embedding:
+            return _empty_result()
+        query_vec = np.asarray(embedding, dtype="float32")
+    else:
+        # Copy so the in-place normalization below can't mutate the
+        # caller's array.
+        query_vec = np.array(query_vec, dtype="float32")
     query_vec = _normalize(query_vec)
 
-    index = faiss.read_index(index_path)
-    scores, indices = index.search(query_vec.reshape(1, -1), top_k)
+    cached = query_cache.lookup(query_vec)
+    if cached is not None:
+        return cached
+
+    index = _get_index(index_path)
+    scores, indices = _search_coalesced(index, query_vec, top_k)
+
+    # Thread-local read-only handle: no per-query connect/teardown, and
+    # SQLite's page cache stays warm across calls on the same worker.
+    cur = read_conn(settings.log_db_path).cursor()
 
-    conn = sqlite3.connect(settings.log_db_path)
-    cur = conn.cursor()
+    # Filter padding hits (-1) vectorized; tolist() yields native Python
+    # ints/floats so no per-element casts in the loop below.
+    mask = indices >= 0
+    idx_list = indices[mask].tolist()
+    score_list = scores[mask].tolist()
+    meta_by_idx = _fetch_chunk_metadata_batch(cur, idx_list)
 
     chunk_hits: List[Dict[str, Any]] = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx < 0:
-            continue
-        meta = _fetch_chunk_metadata(cur, int(idx))
+    for score, idx in zip(score_list, idx_list):
+        meta = meta_by_idx.get(idx)
         if not meta:
             continue
         chunk_hits.append(
             {
                 "chunk_id": meta["chunk_id"],
                 "doc_id": meta["doc_id"],
-                "score": float(score),
+                "score": score,
                 "title": meta["title"],
                 "page_title": meta.get("page_title"),
                 "jurisdiction": meta["jurisdiction"],
@@ -96,11 +306,10 @@ def retrieve(query: str, top_k: Optional[int] = None) -> Dict[str, Any]:
                 "source_url": meta.get("source_url"),
                 "source_name": meta.get("source_name"),
                 "source_domain": meta.get("source_domain"),
+                "preview": meta["preview"],
             }
         )
 
-    conn.close()
-
     if not chunk_hits:
         return _empty_result()
 
@@ -125,22 +334,28 @@ def retrieve(query: str, top_k: Optional[int] = None) -> Dict[str, Any]:
         if chunk["score"] > group["best_score"]:
             group["best_score"] = chunk["score"]
 
-    sorted_groups = sorted(
+    max_sources = settings.top_sources if settings.top_sources > 0 else 1
+    # Only the top few groups/chunks survive, so nsmallest/nlargest
+    # (O(n log k)) beats sorting everything.
+    top_groups = heapq.nsmallest(
+        max_sources,
         groups.values(),
         key=lambda g: (-g["best_score"], g["first_rank"]),
     )
 
-    max_sources = settings.top_sources if settings.top_sources > 0 else 1
     sources: List[Dict[str, Any]] = []
-    for idx, group in enumerate(sorted_groups[:max_sources], start=1):
-        sorted_chunks = sorted(group["chunks"], key=lambda c: c["score"], reverse=True)
+    for idx, group in enumerate(top_groups, start=1):
+        top_chunks = heapq.nlargest(
+            MAX_EXCERPTS_PER_SOURCE, group["chunks"], key=lambda c: c["score"]
+        )
         excerpts = [
             {
                 "chunk_id": chunk["chunk_id"],
                 "score": chunk["score"],
                 "text": chunk["text"],
+                "preview": chunk["preview"],
             }
-            for chunk in sorted_chunks[:MAX_EXCERPTS_PER_SOURCE]
+            for chunk in top_chunks
         ]
         sources.append(
             {
@@ -157,8 +372,27 @@ def retrieve(query: str, top_k: Optional[int] = None) -> Dict[str, Any]:
             }
         )
 
-    return {
+    # Pre-shaped citation payload so /chat serves it without rebuilding
+    # the same dicts and re-slicing previews per request.
+    sources_payload = [
+        {
+            "id": source["source_id"],
+            "title": source["page_title"] or source["title"],
+            "page_title": source["page_title"],
+            "source_domain": source["source_domain"],
+            "jurisdiction": source["jurisdiction"],
+            "url": source["source_url"],
+            "score": source["score"],
+            "previews": [e["preview"] for e in source["excerpts"] if e["preview"]],
+        }
+        for source in sources
+    ]
+
+    result = {
         "sources": sources,
+        "sources_payload": sources_payload,
         "chunks_retrieved": len(chunk_hits),
         "sources_deduped": len(groups),
     }
+    query_cache.insert(query_vec, result)
+    return result
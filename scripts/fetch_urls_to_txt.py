@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 from typing import List, Sequence
 
+try:  # orjson parses bytes directly and several times faster
+    import orjson as _json
+except ImportError:  # pragma: no cover - minimal installs
+    import json as _json
+
 from app.corpus.fetcher import SourceSpec, fetch_sources, _load_specs_from_payload
 
 
@@ -19,10 +23,11 @@ def load_specs_from_args(args: argparse.Namespace) -> Sequence[SourceSpec]:
     specs: List[SourceSpec] = []
     json_strings = args.urls_json or []
     for payload in json_strings:
-        specs.extend(_load_specs_from_payload(json.loads(payload)))
+        specs.extend(_load_specs_from_payload(_json.loads(payload)))
     file_paths = args.urls_file or []
     for path in file_paths:
-        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        # read_bytes + orjson skips the Python-level utf-8 decode pass.
+        payload = _json.loads(Path(path).read_bytes())
         specs.extend(_load_specs_from_payload(payload))
     return specs
 
@@ -0,0 +1,71 @@
+"""Regression tests for the in-process limit counters."""
+import os
+import tempfile
+import threading
+import unittest
+
+from app.core import limits
+from app.observability.logger import init_db
+
+
+class ConcurrentDayLimitTest(unittest.TestCase):
+    """check_and_increment must not lose updates under concurrency.
+
+    The daily count used to be read under one lock acquisition and
+    written back under a later one without re-reading, so concurrent
+    callers overwrote each other's increments and a user could exceed
+    QUESTION_LIMIT_PER_DAY (observed through /chat/batch).
+    """
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp.name, "events.db")
+        init_db(self.db_path)
+        with limits._lock:
+            limits._day_counts.clear()
+            limits._session_counts.clear()
+            limits._dirty_days.clear()
+            limits._dirty_sessions.clear()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_concurrent_increments_respect_day_limit(self):
+        user_hash = limits.hash_user_id("user@example.com", "salt")
+        session_id = "sess_concurrent"
+        limits.ensure_session(self.db_path, session_id, user_hash)
+
+        day_limit = 10
+        results = []
+        results_lock = threading.Lock()
+        barrier = threading.Barrier(20)
+
+        def worker():
+            barrier.wait()
+            for _ in range(10):
+                allowed, reason = limits.check_and_increment(
+                    self.db_path,
+                    user_id_hash=user_hash,
+                    session_id=session_id,
+                    q_limit_day=day_limit,
+                    q_limit_session=1000,
+                )
+                with results_lock:
+                    results.append((allowed, reason))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        granted = sum(1 for allowed, _ in results if allowed)
+        self.assertEqual(granted, day_limit)
+        day_key = (limits._today(), user_hash)
+        with limits._lock:
+            self.assertEqual(limits._day_counts[day_key], day_limit)
+            self.assertEqual(limits._session_counts[session_id], day_limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
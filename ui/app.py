@@ -3,12 +3,19 @@ from __future__ import annotations
 import html
 import os
 import re
-import uuid
-from typing import Any, Dict, List, Sequence
+import secrets
+from typing import TYPE_CHECKING, Any, Sequence
 
-import requests
 import streamlit as st
 
+if TYPE_CHECKING:  # pragma: no cover - annotations only
+    import requests
+
+try:  # C-extension parser when available; payloads are plain JSON either way
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - optional dependency
+    from json import loads as _json_loads
+
 
 def _secret_value(key: str) -> str | None:
     try:
@@ -39,7 +46,10 @@ def _resolve_public_mode() -> bool:
 
 DEFAULT_API_BASE = _resolve_api_base_default()
 PUBLIC_UI = _resolve_public_mode()
-REQUEST_TIMEOUT = 60
+# (connect, read): fail fast on an unreachable API without shortening the
+# budget for slow LLM answers. /chat overrides the read half upward.
+REQUEST_TIMEOUT = (5, 60)
+CHAT_TIMEOUT = (5, 120)
 
 QUICK_START_QUESTIONS = [
     "What is the OSFI stress test for uninsured mortgages?",
@@ -118,8 +128,21 @@ PUBLIC_HIDE_SIDEBAR_CSS = """
 """
 
 
+def _minify_css(css: str) -> str:
+    return re.sub(r"\s+", " ", css).strip()
+
+
+# Minified once at import; every rerun re-sends the style block (elements
+# not re-emitted are removed from the page), so the payload is shrunk and
+# the public variant pre-joined to keep it to one markdown element.
+_BASE_CSS = _minify_css(CUSTOM_CSS)
+_PUBLIC_CSS = _minify_css(CUSTOM_CSS + PUBLIC_HIDE_SIDEBAR_CSS)
+
+
 def _random_id(prefix: str) -> str:
-    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+    # 4 bytes straight from the OS pool; uuid4 builds a 16-byte UUID and
+    # formats 32 hex chars just to keep 8.
+    return f"{prefix}-{secrets.token_hex(4)}"
 
 
 def _build_url(base_url: str, path: str) -> str:
@@ -129,22 +152,63 @@ def _build_url(base_url: str, path: str) -> str:
     return f"{base}{path}"
 
 
+@st.cache_resource(show_spinner=False)
+def _get_http_session() -> requests.Session:
+    """One keep-alive session shared across reruns and users.
+
+    requests.request builds and tears down a Session (and its TCP/TLS
+    connection) per call; pooling keeps connections to the API warm so
+    each question costs zero handshakes after the first.
+
+    requests (and its urllib3/idna stack) is imported here, on the
+    first API call, instead of at module import so it stays off the
+    first-paint path.
+    """
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=requests.adapters.Retry(
+            total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504)
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 def call_api(method: str, path: str, base_url: str, **kwargs: Any) -> tuple[bool, Any, int | None, str, str | None]:
+    import requests
+
     url = _build_url(base_url, path)
     try:
-        response = requests.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        response = _get_http_session().request(method, url, **kwargs)
     except requests.RequestException as exc:
         return False, None, None, "", str(exc)
+    return _parse_response(response)
+
 
-    raw_text = response.text or ""
+def _parse_response(response: requests.Response) -> tuple[bool, Any, int | None, str, str | None]:
+    # response.text decodes the whole body into a str; skip it when the
+    # body parsed as JSON (the normal case) — error branches below and
+    # the non-JSON fallback are the only readers.
     try:
-        payload = response.json()
+        payload = _json_loads(response.content)
+        raw_text = ""
     except ValueError:
+        # Decode the bytes we already hold; response.text would run
+        # charset detection over the same buffer.
+        raw_text = response.content.decode("utf-8", "replace")
         payload = raw_text
 
     if response.ok:
         return True, payload, response.status_code, raw_text, None
 
+    if not raw_text:
+        raw_text = response.content.decode("utf-8", "replace")
     error_message: str | None = None
     if isinstance(payload, dict):
         error_message = payload.get("detail") or payload.get("message")
@@ -153,13 +217,35 @@ def call_api(method: str, path: str, base_url: str, **kwargs: Any) -> tuple[bool
     return False, payload, response.status_code, raw_text, error_message
 
 
+def _iter_sse_events(lines: Any) -> Any:
+    """Yield (event, data) pairs from an SSE line stream."""
+    event: str | None = None
+    data_parts: list[str] = []
+    for line in lines:
+        if not line:
+            if event and data_parts:
+                yield event, "\n".join(data_parts)
+            event, data_parts = None, []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data_parts.append(line[5:].lstrip())
+    if event and data_parts:
+        yield event, "\n".join(data_parts)
+
+
 def _ensure_state() -> None:
     state = st.session_state
     state.setdefault("api_base_url", DEFAULT_API_BASE)
-    state.setdefault("user_id", _random_id("user"))
-    state.setdefault("session_id", _random_id("session"))
+    # Not setdefault: that would draw fresh ids on every rerun only to
+    # throw them away once the keys exist.
+    if "user_id" not in state:
+        state["user_id"] = _random_id("user")
+    if "session_id" not in state:
+        state["session_id"] = _random_id("session")
     state.setdefault("chat_history", [])
     state.setdefault("health_data", None)
+    state.setdefault("health_flat", None)
     state.setdefault("auto_rotate_session", False)
     state.setdefault("show_raw_json", False)
     state.setdefault("clear_question_input", False)
@@ -167,54 +253,80 @@ def _ensure_state() -> None:
     state.setdefault("public_ui", PUBLIC_UI)
 
 
-def _extract_from_health(data: Dict[str, Any] | None, paths: Sequence[Sequence[str]]) -> Any:
-    if not isinstance(data, dict):
-        return None
-    for path in paths:
-        current: Any = data
-        for key in path:
-            if not isinstance(current, dict):
-                break
-            current = current.get(key)
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_health(api_base: str) -> tuple[bool, dict[str, Any] | None, str, str | None]:
+    """Fetch /health at most once per 5 minutes per API base."""
+    ok, payload, _, raw_text, err = call_api("GET", "/health", api_base)
+    return ok, payload if isinstance(payload, dict) else None, raw_text, err
+
+
+def _flatten_health(data: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Flatten a nested health payload into dotted keys, once per fetch."""
+    flat: dict[str, Any] = {}
+    for key, value in data.items():
+        dotted = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten_health(value, f"{dotted}."))
         else:
-            if current is not None:
-                return current
-    return None
+            flat[dotted] = value
+    return flat
 
 
-def render_sidebar() -> tuple[str, str, str, bool]:
-    sidebar = st.sidebar
-    sidebar.title("Mortgage Agent")
-    sidebar.caption("Configure your session or open the advanced tools for diagnostics.")
+def _health_value(flat: dict[str, Any], keys: Sequence[str]) -> Any:
+    for key in keys:
+        value = flat.get(key)
+        if value is not None:
+            return value
+    return None
+
 
-    health = st.session_state.get("health_data")
+@st.fragment
+def _identity_fragment() -> None:
+    """Session identity widgets; rotating an id reruns only this block.
 
-    sidebar.subheader("Session identity")
-    user_id_input = sidebar.text_input("user_id", value=st.session_state["user_id"])
+    The caller places this inside `with st.sidebar:` — fragments may be
+    rendered in the sidebar but must not open the sidebar context
+    themselves. Consumers (_ask_section, feedback fallbacks) read the
+    ids from session_state at send time, so a fragment-scoped rotation
+    is picked up without replaying the page. Needs Streamlit >= 1.37
+    for st.fragment.
+    """
+    st.subheader("Session identity")
+    user_id_input = st.text_input("user_id", value=st.session_state["user_id"])
     if user_id_input.strip():
         st.session_state["user_id"] = user_id_input.strip()
-    if sidebar.button("New user_id"):
+    if st.button("New user_id"):
         st.session_state["user_id"] = _random_id("user")
-        st.rerun()
+        st.rerun(scope="fragment")
 
-    session_id_input = sidebar.text_input("session_id", value=st.session_state["session_id"])
+    session_id_input = st.text_input("session_id", value=st.session_state["session_id"])
     if session_id_input.strip():
         st.session_state["session_id"] = session_id_input.strip()
-    if sidebar.button("New session_id"):
+    if st.button("New session_id"):
         st.session_state["session_id"] = _random_id("session")
-        st.rerun()
+        st.rerun(scope="fragment")
+
+
+def render_sidebar() -> tuple[str, str, str, bool]:
+    sidebar = st.sidebar
+    sidebar.title("Mortgage Agent")
+    sidebar.caption("Configure your session or open the advanced tools for diagnostics.")
+
+    with st.sidebar:
+        _identity_fragment()
 
-    question_limit_day = _extract_from_health(
-        health,
-        (("limits", "per_day"), ("limits", "question_limit_per_day"), ("QUESTION_LIMIT_PER_DAY",), ("question_limit_per_day",)),
+    health_flat = st.session_state.get("health_flat") or {}
+    question_limit_day = _health_value(
+        health_flat,
+        ("limits.per_day", "limits.question_limit_per_day", "QUESTION_LIMIT_PER_DAY", "question_limit_per_day"),
     )
-    question_limit_session = _extract_from_health(
-        health,
-        (("limits", "per_session"), ("limits", "question_limit_per_session"), ("QUESTION_LIMIT_PER_SESSION",)),
+    question_limit_session = _health_value(
+        health_flat,
+        ("limits.per_session", "limits.question_limit_per_session", "QUESTION_LIMIT_PER_SESSION"),
     )
-    char_limit = _extract_from_health(
-        health,
-        (("limits", "character_limit"), ("CHARACTER_LIMIT_PER_QUESTION",), ("character_limit_per_question",)),
+    char_limit = _health_value(
+        health_flat,
+        ("limits.character_limit", "CHARACTER_LIMIT_PER_QUESTION", "character_limit_per_question"),
     )
 
     sidebar.markdown("### Limits")
@@ -247,14 +359,18 @@ def render_sidebar() -> tuple[str, str, str, bool]:
 
             col_health, col_ingest = st.columns(2)
             if col_health.button("Check health"):
-                ok, payload, _, raw_text, err = call_api("GET", "/health", api_base)
-                if ok and isinstance(payload, dict):
+                ok, payload, raw_text, err = _fetch_health(api_base)
+                if ok and payload is not None:
                     st.session_state["health_data"] = payload
+                    st.session_state["health_flat"] = _flatten_health(payload)
                     st.success("Health check succeeded")
                 elif ok:
                     st.warning("Health endpoint did not return JSON")
                     st.code(raw_text)
                 else:
+                    # Don't pin a failure for the whole TTL; let the next
+                    # click retry immediately.
+                    _fetch_health.clear()
                     st.error(f"Health check failed: {err or 'Unknown error'}")
 
             if col_ingest.button("Run ingestion"):
@@ -292,43 +408,148 @@ def render_sidebar() -> tuple[str, str, str, bool]:
     return api_base, st.session_state["user_id"], st.session_state["session_id"], show_raw
 
 
-def _extract_answer(payload: Any) -> str:
-    if isinstance(payload, dict):
-        for key in ("answer", "message", "response", "output"):
-            value = payload.get(key)
-            if value:
-                return str(value)
-    return str(payload) if payload is not None else ""
+_ANSWER_KEYS = ("answer", "message", "response", "output")
+
+
+def _extract_answer_and_citations(payload: Any) -> tuple[str, list[dict[str, Any]]]:
+    """Pull both fields behind one type check, once per response."""
+    if not isinstance(payload, dict):
+        return (str(payload) if payload is not None else "", [])
+    answer = ""
+    for key in _ANSWER_KEYS:
+        value = payload.get(key)
+        if value:
+            answer = str(value)
+            break
+    citations = payload.get("citations")
+    if not isinstance(citations, list):
+        return answer, []
+    return answer, [c for c in citations if isinstance(c, dict)]
+
+
+# History entries are immutable once appended, so their HTML is rendered
+# once in _send_question and replayed verbatim on every rerun instead of
+# rebuilding f-strings (and re-escaping every field) per turn per rerun.
+_USER_HTML_TMPL = """
+<div class="user-message">
+    <div class="message-label">You</div>
+    <div class="message-text">{body}</div>
+</div>
+"""
 
+_ASSISTANT_HTML_TMPL = """
+<div class="assistant-message">
+    <div class="message-label">Assistant</div>
+    <div class="message-text">{body}</div>
+</div>
+"""
+
+_ERROR_HTML_TMPL = """
+<div class="assistant-message error">
+    <div class="message-label">Assistant</div>
+    <div class="message-text">{body}</div>
+</div>
+"""
+
+_CITATION_HTML_TMPL = """
+<div class="source-citation">
+    <strong>{id}</strong> · {title} ({suffix}){link}
+</div>
+"""
 
-def _extract_citations(payload: Any) -> list[dict[str, Any]]:
-    if isinstance(payload, dict):
-        citations = payload.get("citations")
-        if isinstance(citations, list):
-            return [c for c in citations if isinstance(c, dict)]
-    return []
 
+def _render_citation_html(source: dict[str, Any]) -> str:
+    source_id = source.get("id") or source.get("source_id") or "S?"
+    title = (
+        source.get("page_title")
+        or source.get("title")
+        or source.get("document_title")
+        or "Untitled Source"
+    )
+    jurisdiction = source.get("jurisdiction") or source.get("scope") or "N/A"
+    url = source.get("url") or source.get("source_url")
+    domain = source.get("source_domain") or source.get("domain")
+    suffix = jurisdiction
+    if domain:
+        suffix = f"{suffix}, {domain}"
+    safe_url = html.escape(url, quote=True) if url else ""
+    link_html = f' — <a href="{safe_url}" target="_blank" rel="noopener">{safe_url}</a>' if safe_url else ""
+    return _CITATION_HTML_TMPL.format(
+        id=html.escape(str(source_id)),
+        title=_format_text_html(title),
+        suffix=_format_text_html(suffix),
+        link=link_html,
+    )
 
-_DOLLAR_PATTERN = re.compile(r"(?<!\\)\$")
-_BACKTICK_PATTERN = re.compile(r"(?<!\\)`")
+
+def _precompute_entry_html(entry: dict[str, Any]) -> None:
+    """Attach rendered HTML to a history entry at append time."""
+    entry["user_html"] = _USER_HTML_TMPL.format(body=_format_text_html(entry["question"]))
+    error_text = entry.get("error")
+    if error_text:
+        entry["assistant_html"] = _ERROR_HTML_TMPL.format(body=_format_text_html(error_text))
+        entry["citations_html"] = []
+    else:
+        entry["assistant_html"] = _ASSISTANT_HTML_TMPL.format(
+            body=_format_text_html(entry.get("answer") or "No answer returned.")
+        )
+        entry["citations_html"] = [_render_citation_html(c) for c in entry.get("citations") or []]
+
+
+# One alternation keeps the (?<!\\) semantics of the old dollar/backtick
+# patterns while traversing the text once instead of twice.
+_MD_SPECIAL_PATTERN = re.compile(r"(?<!\\)([$`])")
+_MD_SPECIAL_SUB = _MD_SPECIAL_PATTERN.sub
 
 
 def sanitize_for_streamlit_md(text: str) -> str:
     if not text:
         return ""
-    sanitized = _DOLLAR_PATTERN.sub(r"\\$", text)
-    sanitized = _BACKTICK_PATTERN.sub(r"\\`", sanitized)
-    return sanitized
+    return _MD_SPECIAL_SUB(r"\\\1", text)
+
+
+# Markdown escaping, HTML escaping, and newline conversion fused into
+# one translate table: one C-level pass instead of three full copies.
+_FORMAT_HTML_TABLE = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "'": "&#x27;",
+        "$": r"\$",
+        "`": r"\`",
+        "\n": "<br>",
+    }
+)
 
 
 def _format_text_html(text: str) -> str:
-    sanitized = sanitize_for_streamlit_md(text)
-    escaped = html.escape(sanitized)
+    if not text:
+        return ""
+    if "\\" not in text:
+        return text.translate(_FORMAT_HTML_TABLE)
+    # A pre-existing backslash may already escape $ or `; keep the exact
+    # lookbehind semantics on this rare path.
+    escaped = html.escape(sanitize_for_streamlit_md(text))
     return escaped.replace("\n", "<br>")
 
 
-def _append_history(entry: Dict[str, Any]) -> None:
-    st.session_state.chat_history.append(entry)
+# Oldest turns are dropped past this point; each entry can hold a full
+# LLM answer (twice, with raw debug fields), all resident per session.
+MAX_HISTORY = 50
+
+
+def _keep_raw_response() -> bool:
+    return not PUBLIC_UI and bool(st.session_state.get("show_raw_json"))
+
+
+def _append_history(entry: dict[str, Any]) -> None:
+    _precompute_entry_html(entry)
+    history = st.session_state.chat_history
+    history.append(entry)
+    if len(history) > MAX_HISTORY:
+        history[:] = history[-MAX_HISTORY:]
 
 
 def _set_feedback_state(request_id: str, status: str, message: str | None = None) -> None:
@@ -343,7 +564,7 @@ def _get_feedback_state(request_id: str) -> tuple[str, str | None]:
     return status, message
 
 
-def _submit_feedback(entry: Dict[str, Any], helpful: bool, comment: str | None, api_base: str, user_id: str, session_id: str, request_id: str | None = None) -> None:
+def _submit_feedback(entry: dict[str, Any], helpful: bool, comment: str | None, api_base: str, user_id: str, session_id: str, request_id: str | None = None) -> None:
     request_id = request_id or entry.get("request_id")
     if not request_id:
         st.error("Couldn't send feedback. Please try again.")
@@ -366,141 +587,260 @@ def _submit_feedback(entry: Dict[str, Any], helpful: bool, comment: str | None,
             print(f"Feedback submission failed: status={status_code}, error={err}, body={raw_text}")
 
 
-def _render_history(api_base: str, user_id: str, session_id: str, show_raw: bool) -> None:
-    history: List[Dict[str, Any]] = st.session_state.get("chat_history", [])
-    if not history:
-        st.info("No questions asked yet.")
+# Turns rendered inline per rerun; older turns collapse behind one
+# expander so the widget count stays bounded as a chat grows.
+RECENT_TURNS = 10
+
+
+@st.fragment
+def _feedback_fragment(item: dict[str, Any], request_id: str, api_base: str, user_id: str, session_id: str) -> None:
+    """Feedback widgets for one turn; reruns stay scoped to this block."""
+    status, message = _get_feedback_state(request_id)
+    if status == "success":
+        st.markdown("**Feedback**")
+        st.success(message or "Thanks — feedback received.")
         return
-    for idx, item in enumerate(history):
-        user_html = f"""
-        <div class="user-message">
-            <div class="message-label">You</div>
-            <div class="message-text">{_format_text_html(item["question"])}</div>
-        </div>
-        """
-        st.markdown(user_html, unsafe_allow_html=True)
-
-        error_text = item.get("error")
-        if error_text:
-            assistant_html = f"""
-            <div class="assistant-message error">
-                <div class="message-label">Assistant</div>
-                <div class="message-text">{_format_text_html(error_text)}</div>
-            </div>
-            """
-            st.markdown(assistant_html, unsafe_allow_html=True)
+    if not st.session_state.get(f"feedback_open_{request_id}"):
+        # One button per turn until the user opts in; the full form is
+        # three widgets and most turns never get feedback.
+        if st.button("Leave feedback", key=f"open_fb_{request_id}"):
+            st.session_state[f"feedback_open_{request_id}"] = True
+            st.rerun(scope="fragment")
+        return
+    st.markdown("**Feedback**")
+    if status == "error":
+        st.error(message or "Couldn't send feedback. Please try again.")
+    choice_key = f"feedback_choice_{request_id}"
+    comment_key = f"feedback_comment_{request_id}"
+    options = ["Select...", "Helpful", "Not helpful"]
+    selection = st.selectbox(
+        "How was this answer?",
+        options,
+        key=choice_key,
+        index=0,
+    )
+    comment = st.text_area("What was missing or wrong?", key=comment_key, height=100)
+    if st.button("Send feedback", key=f"send_feedback_{request_id}"):
+        if selection == "Select...":
+            st.warning("Please select whether the answer was helpful.")
         else:
-            answer_html = f"""
-            <div class="assistant-message">
-                <div class="message-label">Assistant</div>
-                <div class="message-text">{_format_text_html(item.get("answer") or "No answer returned.")}</div>
-            </div>
-            """
-            st.markdown(answer_html, unsafe_allow_html=True)
-            citations = item.get("citations") or []
+            helpful = selection == "Helpful"
+            _submit_feedback(item, helpful, comment, api_base, user_id, session_id, request_id=request_id)
+            st.rerun(scope="fragment")
+
+
+def _render_turn(item: dict[str, Any], idx: int, api_base: str, user_id: str, session_id: str, show_raw: bool, inline: bool = True) -> None:
+    st.markdown(item["user_html"], unsafe_allow_html=True)
+    st.markdown(item["assistant_html"], unsafe_allow_html=True)
+
+    if not item.get("error"):
+        citations_html = item.get("citations_html") or []
+        if inline:
             with st.expander("Citations", expanded=False):
-                if not citations:
+                if not citations_html:
                     st.write("No citations returned.")
                 else:
-                    for source in citations:
-                        source_id = source.get("id") or source.get("source_id") or "S?"
-                        title = (
-                            source.get("page_title")
-                            or source.get("title")
-                            or source.get("document_title")
-                            or "Untitled Source"
-                        )
-                        jurisdiction = source.get("jurisdiction") or source.get("scope") or "N/A"
-                        url = source.get("url") or source.get("source_url")
-                        domain = source.get("source_domain") or source.get("domain")
-                        suffix = jurisdiction
-                        if domain:
-                            suffix = f"{suffix}, {domain}"
-                        safe_title = _format_text_html(title)
-                        safe_suffix = _format_text_html(suffix)
-                        safe_id = html.escape(str(source_id))
-                        safe_url = html.escape(url, quote=True) if url else ""
-                        link_html = f' — <a href="{safe_url}" target="_blank" rel="noopener">{safe_url}</a>' if safe_url else ""
-                        citation_html = f"""
-                        <div class="source-citation">
-                            <strong>{safe_id}</strong> · {safe_title} ({safe_suffix}){link_html}
-                        </div>
-                        """
-                        st.markdown(citation_html, unsafe_allow_html=True)
-            request_id = item.get("request_id") or f"turn_{idx}"
-            st.markdown("**Feedback**")
-            status, message = _get_feedback_state(request_id)
-            if status == "success":
-                st.success(message or "Thanks — feedback received.")
-            else:
-                if status == "error":
-                    st.error(message or "Couldn't send feedback. Please try again.")
-                choice_key = f"feedback_choice_{request_id}"
-                comment_key = f"feedback_comment_{request_id}"
-                options = ["Select...", "Helpful", "Not helpful"]
-                selection = st.selectbox(
-                    "How was this answer?",
-                    options,
-                    key=choice_key,
-                    index=0,
-                )
-                comment = st.text_area("What was missing or wrong?", key=comment_key, height=100)
-                if st.button("Send feedback", key=f"send_feedback_{request_id}"):
-                    if selection == "Select...":
-                        st.warning("Please select whether the answer was helpful.")
-                    else:
-                        helpful = selection == "Helpful"
-                        _submit_feedback(item, helpful, comment, api_base, user_id, session_id, request_id=request_id)
-                        st.rerun()
-        if show_raw:
-            raw_payload = item.get("raw_payload")
-            if isinstance(raw_payload, (dict, list)):
-                st.json(raw_payload)
-            elif item.get("raw_text"):
-                st.code(item["raw_text"])
+                    # One markdown element for all citations: each st.markdown
+                    # is a separate frontend message and DOM node.
+                    st.markdown("\n".join(citations_html), unsafe_allow_html=True)
+        elif citations_html:
+            # Expanders don't nest, so collapsed turns show citations flat.
+            st.markdown("\n".join(citations_html), unsafe_allow_html=True)
+        request_id = item.get("request_id") or f"turn_{idx}"
+        status, _ = _get_feedback_state(request_id)
+        if status == "success" and not inline:
+            pass  # collapsed turns don't replay the thank-you banner
+        else:
+            _feedback_fragment(item, request_id, api_base, user_id, session_id)
+    if show_raw:
+        raw_payload = item.get("raw_payload")
+        if isinstance(raw_payload, (dict, list)):
+            st.json(raw_payload)
+        elif item.get("raw_text"):
+            st.code(item["raw_text"])
+
+
+def _render_history(api_base: str, user_id: str, session_id: str, show_raw: bool) -> None:
+    history: list[dict[str, Any]] = st.session_state.get("chat_history", [])
+    if not history:
+        st.info("No questions asked yet.")
+        return
+    older = history[:-RECENT_TURNS]
+    if older:
+        with st.expander(f"Show earlier {len(older)} turns", expanded=False):
+            for idx, item in enumerate(older):
+                _render_turn(item, idx, api_base, user_id, session_id, show_raw, inline=False)
+    for offset, item in enumerate(history[-RECENT_TURNS:]):
+        _render_turn(item, len(older) + offset, api_base, user_id, session_id, show_raw)
+
+
+def _consume_chat_stream(response: requests.Response) -> tuple[bool, Any, int | None, str, str | None]:
+    """Render delta frames as they arrive; return the terminal payload.
+
+    The `done` frame carries the same JSON body as the buffered endpoint
+    (after grounding checks), so the history entry is built from it, not
+    from the concatenated deltas.
+    """
+    import requests
+
+    final: dict[str, Any] = {}
+
+    def _deltas():
+        with response:
+            for event, data in _iter_sse_events(response.iter_lines(decode_unicode=True)):
+                if event == "delta":
+                    text = _json_loads(data).get("text")
+                    if text:
+                        yield text
+                elif event == "done":
+                    final.update(_json_loads(data))
+
+    try:
+        st.write_stream(_deltas())
+    except (requests.RequestException, ValueError) as exc:
+        return False, None, response.status_code, "", str(exc)
+    if not final:
+        return False, None, response.status_code, "", "Stream ended without a final response"
+    return True, final, response.status_code, "", None
 
 
 def _send_question(question: str, api_base: str, user_id: str, session_id: str) -> None:
-    payload = {"message": question, "user_id": user_id, "session_id": session_id}
-    ok, response_payload, status_code, raw_text, err = call_api("POST", "/chat", api_base, json=payload)
+    import requests
 
-    if ok:
-        answer = _extract_answer(response_payload)
-        citations = _extract_citations(response_payload)
-        _append_history(
-            {
-                "question": question,
-                "answer": answer,
-                "citations": citations,
-                "raw_payload": response_payload,
-                "raw_text": raw_text,
-                "request_id": response_payload.get("request_id"),
-                "session_id": response_payload.get("session_id") or session_id,
-                "user_id": user_id,
-            }
+    payload = {"message": question, "user_id": user_id, "session_id": session_id, "stream": True}
+    try:
+        response = _get_http_session().post(
+            _build_url(api_base, "/chat"), json=payload, timeout=CHAT_TIMEOUT, stream=True
         )
+    except requests.RequestException as exc:
+        ok, response_payload, status_code, raw_text, err = False, None, None, "", str(exc)
+    else:
+        content_type = response.headers.get("content-type", "")
+        if response.ok and content_type.startswith("text/event-stream"):
+            ok, response_payload, status_code, raw_text, err = _consume_chat_stream(response)
+        else:
+            # Backend without streaming support answers with plain JSON.
+            ok, response_payload, status_code, raw_text, err = _parse_response(response)
+
+    if ok:
+        _append_success_entry(question, response_payload, raw_text, user_id, session_id)
         if st.session_state.get("auto_rotate_session"):
             st.session_state["session_id"] = _random_id("session")
     else:
         error_text = err or "Request failed"
         if status_code == 429:
             error_text = "Rate limit hit (HTTP 429). Please wait before asking again."
-        _append_history(
-            {
-                "question": question,
-                "error": error_text,
-                "raw_payload": response_payload,
-                "raw_text": raw_text,
-            }
-        )
+        _append_error_entry(question, error_text, response_payload, raw_text)
         st.error(error_text)
 
 
+def _append_success_entry(question: str, response_payload: dict[str, Any], raw_text: str, user_id: str, session_id: str) -> None:
+    keep_raw = _keep_raw_response()
+    # raw_text duplicates raw_payload's content; the debug view prefers
+    # the structured form, so keep the string only when that's all we have.
+    keep_text = keep_raw and not isinstance(response_payload, (dict, list))
+    answer, citations = _extract_answer_and_citations(response_payload)
+    _append_history(
+        {
+            "question": question,
+            "answer": answer,
+            "citations": citations,
+            "raw_payload": response_payload if keep_raw else None,
+            "raw_text": raw_text if keep_text else None,
+            "request_id": response_payload.get("request_id"),
+            "session_id": response_payload.get("session_id") or session_id,
+            "user_id": user_id,
+        }
+    )
+
+
+def _append_error_entry(question: str, error_text: str, response_payload: Any, raw_text: str) -> None:
+    keep_raw = _keep_raw_response()
+    keep_text = keep_raw and not isinstance(response_payload, (dict, list))
+    _append_history(
+        {
+            "question": question,
+            "error": error_text,
+            "raw_payload": response_payload if keep_raw else None,
+            "raw_text": raw_text if keep_text else None,
+        }
+    )
+
+
+# Server-side cap on /chat/batch (BATCH_MAX_QUESTIONS in app/main.py);
+# larger submissions are split into requests of this size.
+BATCH_MAX_QUESTIONS = 10
+
+
+def _send_question_batch(questions: list[str], api_base: str, user_id: str, session_id: str) -> None:
+    """Submit several questions via /chat/batch, chunked to the server cap."""
+    for start in range(0, len(questions), BATCH_MAX_QUESTIONS):
+        chunk = questions[start : start + BATCH_MAX_QUESTIONS]
+        payload = {
+            "messages": [
+                {"message": q, "user_id": user_id, "session_id": session_id} for q in chunk
+            ]
+        }
+        ok, response_payload, status_code, raw_text, err = call_api(
+            "POST", "/chat/batch", api_base, json=payload, timeout=CHAT_TIMEOUT
+        )
+        if not ok:
+            error_text = err or "Request failed"
+            if status_code == 429:
+                error_text = "Rate limit hit (HTTP 429). Please wait before asking again."
+            for question in chunk:
+                _append_error_entry(question, error_text, None, "")
+            st.error(error_text)
+            continue
+
+        responses = response_payload.get("responses") if isinstance(response_payload, dict) else None
+        responses = responses if isinstance(responses, list) else []
+        for idx, question in enumerate(chunk):
+            item = responses[idx] if idx < len(responses) else None
+            if isinstance(item, dict) and not item.get("error"):
+                _append_success_entry(question, item, "", user_id, session_id)
+            else:
+                detail = item.get("error") if isinstance(item, dict) else None
+                _append_error_entry(question, detail or "No response returned.", item, "")
+    if st.session_state.get("auto_rotate_session"):
+        st.session_state["session_id"] = _random_id("session")
+
+
+@st.fragment
+def _ask_section() -> None:
+    """Question input and submit; typing reruns only this fragment.
+
+    Identity and API base come from session_state at submit time so
+    fragment-scoped id rotations apply to the next question. Submitting
+    escalates to a full rerun so the new turn lands in the history above.
+    """
+    api_base = st.session_state.get("api_base_url") or DEFAULT_API_BASE
+    user_id = st.session_state["user_id"]
+    session_id = st.session_state["session_id"]
+    st.subheader("Ask a question")
+    question = st.text_area("Question", key="question_input", height=150)
+    batch_mode = st.checkbox(
+        "Batch mode — separate questions with a blank line",
+        key="batch_mode",
+    )
+    ask_disabled = not question.strip()
+    if st.button("Ask", type="primary", disabled=ask_disabled):
+        cleaned_question = question.strip()
+        if not cleaned_question:
+            st.warning("Please enter a question before submitting.")
+        else:
+            questions = [q.strip() for q in cleaned_question.split("\n\n") if q.strip()]
+            if batch_mode and len(questions) > 1:
+                _send_question_batch(questions, api_base, user_id, session_id)
+            else:
+                _send_question(cleaned_question, api_base, user_id, session_id)
+            st.session_state["clear_question_input"] = True
+            st.rerun(scope="app")
+
+
 def main() -> None:
     st.set_page_config(page_title="Mortgage Agent", layout="wide", initial_sidebar_state="collapsed")
-    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
-    if PUBLIC_UI:
-        st.markdown(PUBLIC_HIDE_SIDEBAR_CSS, unsafe_allow_html=True)
+    st.markdown(_PUBLIC_CSS if PUBLIC_UI else _BASE_CSS, unsafe_allow_html=True)
     _ensure_state()
     if st.session_state.get("clear_question_input"):
         st.session_state["question_input"] = ""
@@ -552,18 +892,7 @@ def main() -> None:
 
     _render_history(api_base, user_id, session_id, show_raw)
 
-    st.subheader("Ask a question")
-    question_key = "question_input"
-    question = st.text_area("Question", key=question_key, height=150)
-    ask_disabled = not question.strip()
-    if st.button("Ask", type="primary", disabled=ask_disabled):
-        cleaned_question = question.strip()
-        if not cleaned_question:
-            st.warning("Please enter a question before submitting.")
-        else:
-            _send_question(cleaned_question, api_base, user_id, session_id)
-            st.session_state["clear_question_input"] = True
-            st.rerun()
+    _ask_section()
 
 
 if __name__ == "__main__":